@@ -0,0 +1,278 @@
+"""NumPy batch engine: thousands of two-seat AI games advanced in lockstep.
+
+Each game is one row of a set of arrays (lives, shield turns, drunk turns,
+missed-turn flags, chamber, cursor, hazard cooldown). Every step plays one
+seat's turn for all active games with masked array operations; finished
+games are recorded and compacted out of the active set.
+
+The rules follow engine.py. Each seat is played by a strategy from
+strategies.py through its batched ``decide_batch``, the classic AI by
+default. Snoop Dogg deciding to join the table is counted in
+``snoop_joined`` but not modelled: the game carries on between the two
+seats.
+
+    python batch.py --games 1000000 --seed 42
+    python batch.py --strategy perfect --policy policy.bin
+"""
+import argparse
+import time
+
+import engine
+from strategies import BATCHED, Situations, ThresholdStrategy, make
+
+try:
+    import numpy as np
+except ImportError:
+    raise ImportError("batch.py needs NumPy: pip install numpy") from None
+
+SEATS = 2
+
+
+def counter_type(highest):
+    """Smallest signed dtype that counts up to `highest`"""
+    return np.int8 if highest <= np.iinfo(np.int8).max else np.int32
+
+
+class BatchState:
+    """Per-game arrays for the games that are still running"""
+
+    def __init__(self, games, lives, bullet_count, rng):
+        self.ids = np.arange(games)
+        self.lives = np.full((games, SEATS), lives, dtype=np.int16)
+        self.shield_turns = np.zeros((games, SEATS), dtype=np.int8)
+        self.drunk_turns = np.zeros((games, SEATS), dtype=np.int8)
+        self.misses = np.zeros((games, SEATS), dtype=bool)
+        self.bullets = rng.integers(0, 2, size=(games, bullet_count), dtype=np.int8)
+        self.current_bullet = np.zeros(games, dtype=counter_type(bullet_count))
+        self.hazard_cooldown = np.zeros(games, dtype=counter_type(engine.RULES.hazard_cooldown[1]))
+        self.snoop_joined = np.zeros(games, dtype=bool)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def keep(self, mask):
+        """Drop every game whose entry in `mask` is False"""
+        for name in ('ids', 'lives', 'shield_turns', 'drunk_turns', 'misses',
+                     'bullets', 'current_bullet', 'hazard_cooldown', 'snoop_joined'):
+            setattr(self, name, getattr(self, name)[mask])
+
+
+class BatchResult:
+    """Outcome of every game in a batch, indexed by game number"""
+
+    def __init__(self, games):
+        self.winner = np.full(games, -1, dtype=np.int8)  # Seat index, -1 for a wipeout
+        self.rounds = np.zeros(games, dtype=np.int32)
+        self.snoop_joined = np.zeros(games, dtype=bool)
+
+    def summary(self):
+        games = len(self.winner)
+        return {
+            'games': games,
+            'player1': int(np.count_nonzero(self.winner == 0)),
+            'player2': int(np.count_nonzero(self.winner == 1)),
+            'wipeout': int(np.count_nonzero(self.winner == -1)),
+            'snoop_joined': int(np.count_nonzero(self.snoop_joined)),
+            'rounds': int(self.rounds.sum()),
+        }
+
+
+class BatchSimulator:
+    def __init__(self, games, lives=None, bullet_count=None, seed=None, strategies=None):
+        self.rng = np.random.default_rng(seed)
+        self.strategies = strategies or (ThresholdStrategy(), ThresholdStrategy())  # One per seat
+        lives = engine.RULES.lives if lives is None else lives
+        bullet_count = engine.RULES.bullets if bullet_count is None else bullet_count
+        self.bullet_count = bullet_count
+        self.state = BatchState(games, lives, bullet_count, self.rng)
+        self.result = BatchResult(games)
+        self.round = 0
+        self.seat = 0
+
+    # Rule helpers, all working on the rows selected by `rows`
+
+    def hit(self, rows, seats, amount=1):
+        """Deal damage through shields, like Player.take_damage"""
+        s = self.state
+        shielded = s.shield_turns[rows, seats] > 0
+        s.shield_turns[rows[shielded], seats[shielded]] -= 1
+        hurt = ~shielded
+        s.lives[rows[hurt], seats[hurt]] -= amount
+
+    def hit_both(self, rows, amount=1):
+        for seat in range(SEATS):
+            self.hit(rows, np.full(len(rows), seat), amount)
+
+    def random_seat(self, rows):
+        return self.rng.integers(0, SEATS, size=len(rows))
+
+    def reload(self, rows):
+        s = self.state
+        s.bullets[rows] = self.rng.integers(0, 2, size=(len(rows), self.bullet_count), dtype=np.int8)
+        s.current_bullet[rows] = 0
+
+    # Round and turn phases
+
+    def hazards(self):
+        s = self.state
+        rng = self.rng
+        struck = (s.hazard_cooldown <= 0) & (rng.random(len(s)) < engine.RULES.hazard_chance)
+        s.hazard_cooldown[~struck] = np.maximum(0, s.hazard_cooldown[~struck] - 1)
+        rows = np.flatnonzero(struck)
+        if not len(rows):
+            return
+        names = engine.HAZARDS.names
+        kind = rng.choice(len(names), size=len(rows), p=engine.HAZARDS.probabilities())
+
+        lightning = rows[kind == names.index("Lightning Storm")]
+        self.hit(lightning, self.random_seat(lightning))
+
+        gas = rows[kind == names.index("Gas Leak")]
+        for seat in range(SEATS):
+            dizzy = gas[rng.random(len(gas)) < 0.7]
+            s.drunk_turns[dizzy, seat] = rng.integers(1, 4, size=len(dizzy))
+
+        outage = rows[kind == names.index("Power Outage")]
+        outage = outage[rng.random(len(outage)) < 0.4]
+        s.misses[outage, self.random_seat(outage)] = True
+
+        quake = rows[kind == names.index("Earthquake")]
+        for seat in range(SEATS):
+            fallen = quake[rng.random(len(quake)) < 0.6]
+            self.hit(fallen, np.full(len(fallen), seat))
+
+        self.hit_both(rows[kind == names.index("Toxic Rain")])
+
+        low, high = engine.RULES.hazard_cooldown
+        s.hazard_cooldown[rows] = rng.integers(low, high + 1, size=len(rows))
+
+    def decide(self, rows, seat):
+        """Actions the strategy in `seat` picks for every game in `rows`"""
+        s = self.state
+        situations = Situations(np.full(len(rows), seat, dtype=np.int8), s.lives[rows], s.shield_turns[rows],
+                                s.drunk_turns[rows], s.misses[rows], s.hazard_cooldown[rows],
+                                self.bullet_count - s.current_bullet[rows])
+        return self.strategies[seat].decide_batch(situations, self.rng)
+
+    def fumble(self, rows, seat, choice):
+        """Drunk players sometimes switch to one of the other two actions"""
+        s = self.state
+        rng = self.rng
+        confused = s.drunk_turns[rows, seat] > 0
+        fumbled = confused & (rng.random(len(rows)) < 0.4)
+        choice[fumbled] = (choice[fumbled] - 1 + rng.integers(1, 3, size=int(fumbled.sum()))) % 3 + 1
+        return choice
+
+    def trigger_pull(self, rows, victims):
+        s = self.state
+        fired = self.rng.random(len(rows)) >= engine.RULES.misfire
+        rows, victims = rows[fired], victims[fired]
+        bang = s.bullets[rows, s.current_bullet[rows]] == 1
+        self.hit(rows[bang], victims[bang])
+        s.current_bullet[rows] += 1
+
+    def spin_event(self, rows):
+        s = self.state
+        rng = self.rng
+        names = engine.EVENTS.names
+        event = rng.choice(len(names), size=len(rows), p=engine.EVENTS.probabilities())
+
+        mysterious = rows[event == names.index("mysterious_man")]
+        self.hit(mysterious, self.random_seat(mysterious), 2)
+
+        potion = rows[event == names.index("potion")]
+        potion_type = rng.integers(1, 4, size=len(potion))
+        s.lives[potion[potion_type == 1], 0] += 1
+        s.lives[potion[potion_type == 2], 1] += 1
+
+        self.hit_both(rows[event == names.index("earthquake")])
+
+        animal = rows[event == names.index("animal")]
+        self.hit(animal, self.random_seat(animal))
+
+        shield = rows[event == names.index("shield")]
+        s.shield_turns[shield, self.random_seat(shield)] = rng.integers(1, 3, size=len(shield))
+
+        snoop = rows[event == names.index("snoop_dogg")]
+        snoop_type = rng.integers(1, 5, size=len(snoop))
+        fallout = snoop[snoop_type == 1]
+        self.hit(fallout, self.random_seat(fallout))
+        self.hit_both(snoop[snoop_type == 2])
+        s.snoop_joined[snoop[snoop_type == 4]] = True
+
+    def update_status(self, seat):
+        s = self.state
+        drunk = s.drunk_turns[:, seat]
+        drunk[drunk > 0] -= 1
+        s.misses[:, seat] = False
+
+    def retire_finished(self):
+        s = self.state
+        alive = s.lives > 0
+        done = alive.sum(axis=1) <= 1
+        if not done.any():
+            return
+        ids = s.ids[done]
+        self.result.winner[ids] = np.where(alive[done, 0], 0, np.where(alive[done, 1], 1, -1))
+        self.result.rounds[ids] = self.round
+        self.result.snoop_joined[ids] = s.snoop_joined[done]
+        s.keep(~done)
+
+    def step(self):
+        """Play one seat's turn in every active game"""
+        s = self.state
+        seat = self.seat
+        if seat == 0:
+            self.round += 1
+            self.hazards()
+            self.retire_finished()
+
+        playing = np.flatnonzero(~s.misses[:, seat])
+        choice = self.fumble(playing, seat, self.decide(playing, seat))
+        self_shot = playing[choice == 1]
+        self.trigger_pull(self_shot, np.full(len(self_shot), seat))
+        shot = playing[choice == 2]
+        self.trigger_pull(shot, np.full(len(shot), 1 - seat))
+        self.spin_event(playing[choice == 3])
+
+        self.update_status(seat)
+        self.reload(np.flatnonzero(s.current_bullet >= self.bullet_count))
+        self.retire_finished()
+        self.seat = 1 - seat
+
+    def run(self):
+        while len(self.state):
+            self.step()
+        return self.result
+
+
+def simulate_batch(games, lives=None, bullet_count=None, seed=None, strategies=None):
+    return BatchSimulator(games, lives, bullet_count, seed, strategies).run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run AI-vs-AI games in lockstep with NumPy")
+    parser.add_argument("-n", "--games", type=int, default=1000000, help="number of games to play")
+    parser.add_argument("--seed", type=int, default=None, help="seed for a reproducible run")
+    parser.add_argument("--weights", help="JSON file with event and hazard weights")
+    parser.add_argument("--strategy", choices=BATCHED, default="classic", help="strategy for player 1")
+    parser.add_argument("--opponent", choices=BATCHED, default="classic", help="strategy for player 2")
+    parser.add_argument("--policy", default="policy.bin", help="policy table for the perfect strategy (see solver.py)")
+    args = parser.parse_args()
+    if args.weights:
+        engine.reload_weights(args.weights)
+    strategies = tuple(make(name, policy=args.policy) for name in (args.strategy, args.opponent))
+
+    start = time.perf_counter()
+    summary = simulate_batch(args.games, seed=args.seed, strategies=strategies).summary()
+    elapsed = time.perf_counter() - start
+    games = summary['games']
+    print(f"Games played:   {games} in {elapsed:.2f}s ({games / elapsed:,.0f} games/s)")
+    print(f"Average rounds: {summary['rounds'] / games:.2f}")
+    for key, label in (('player1', "Player 1 wins"), ('player2', "Player 2 wins"),
+                       ('wipeout', "Wipeouts"), ('snoop_joined', "Snoop joined")):
+        print(f"{label + ':':<16}{summary[key] / games:7.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""Benchmarks for the hot paths and the end-to-end turn rate.
+
+Each benchmark times one small operation in a loop, sized automatically
+so a run lasts at least ``--min-time`` seconds, and keeps the best of
+``--repeat`` runs. Narrated turns run with the clock in turbo mode, output
+sent nowhere and the keyboard stubbed out, so only the work is measured.
+
+Save a baseline, then compare later runs against it. The compare run
+exits with status 1 if any benchmark got slower than the threshold allows:
+
+    python bench.py --save bench.json
+    python bench.py --compare bench.json --threshold 0.25
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+import engine
+from engine import GameState, Player, Roulette, Start, ai_decision_maker
+
+BIG_LIVES = 10 ** 9  # Keeps players alive however many shots a benchmark fires
+
+
+class NullOutput:
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+class NoKeys:
+    def pending(self):
+        return False
+
+
+def bench_spin():
+    roulette = Roulette(random.Random(0))
+    return lambda: roulette.spin(6)
+
+
+def bench_roll():
+    start = Start(random.Random(0))
+    return lambda: start.roll(6)
+
+
+def bench_trigger_pull():
+    game = GameState("A", "B", BIG_LIVES, rng=random.Random(0))
+    shooter, target = game.player1, game.player2
+    return lambda: engine.handle_trigger_pull(game, shooter, target)
+
+
+def bench_ai_decision():
+    rng = random.Random(0)
+    seats = []
+    for lives in (1, 2, 3, 4):
+        for target_lives in (1, 2, 3):
+            player, target = Player("A", lives), Player("B", target_lives)
+            seats.append((player, target))
+    seats[0][0].make_drunk(3)
+    state = {'i': 0}
+
+    def op():
+        i = state['i'] = (state['i'] + 1) % len(seats)
+        player, target = seats[i]
+        return ai_decision_maker(player, target, rng)
+    return op
+
+
+def bench_spin_event():
+    game = GameState("A", "B", BIG_LIVES, rng=random.Random(0))
+    player = game.player1
+    return lambda: engine.spin_event(game, player)
+
+
+def bench_drunk_text():
+    from roulette import drunk_text_effect
+    random.seed(0)
+    return lambda: drunk_text_effect("Player 1 is drunk and confused!")
+
+
+def turn_loop(make_game, decide=engine.ai_decide):
+    """One player_turn per call, starting a new game whenever one ends"""
+    state = {'game': make_game()}
+
+    def op():
+        game = state['game']
+        turn = engine.next_turn(game)
+        if turn is None:
+            game = state['game'] = make_game()
+            turn = engine.next_turn(game)
+        player, target = turn
+        engine.player_turn(game, player, target, decide(game, player, target))
+    return op
+
+
+def bench_player_turn():
+    rng = random.Random(0)
+    return turn_loop(lambda: GameState("A", "B", rng=rng))
+
+
+def bench_narrated_turn():
+    import roulette
+    from roulette import CLOCK, TerminalView
+
+    keys, mode, speed, timeline = roulette.KEYS, CLOCK.mode, CLOCK.speed, list(CLOCK.timeline)
+    roulette.KEYS = NoKeys()
+    sys.stdout = NullOutput()
+    CLOCK.set_mode('turbo')
+    rng = random.Random(0)
+
+    def make_game():
+        CLOCK.timeline.clear()
+        view = TerminalView()
+        game = GameState("A", "B", rng=rng, emit=view)
+        view.game = game
+        view.human = game.player1
+        return game
+
+    def restore():
+        roulette.KEYS = keys
+        CLOCK.set_mode(mode, speed)
+        CLOCK.timeline[:] = timeline
+
+    op = turn_loop(make_game)
+    op.restore = restore
+    return op
+
+
+def bench_game():
+    rng = random.Random(0)
+    return lambda: engine.play(GameState("A", "B", rng=rng))
+
+
+BENCHMARKS = {
+    'roulette.spin': bench_spin,
+    'start.roll': bench_roll,
+    'handle_trigger_pull': bench_trigger_pull,
+    'ai_decision_maker': bench_ai_decision,
+    'spin_event': bench_spin_event,
+    'drunk_text_effect': bench_drunk_text,
+    'player_turn': bench_player_turn,
+    'player_turn.narrated': bench_narrated_turn,
+    'game': bench_game,
+}
+
+
+def measure(factory, min_time=0.2, repeat=5):
+    """Best time per operation in nanoseconds
+
+    The factory returns the operation to time. If it changes global state for
+    the run, it gives the operation a restore() that measure() calls afterwards.
+    """
+    stdout = sys.stdout
+    op = None
+    try:
+        op = factory()
+        loops = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(loops):
+                op()
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+            loops *= 10 if elapsed < min_time / 10 else 2
+        best = elapsed
+        for _ in range(repeat - 1):
+            start = time.perf_counter()
+            for _ in range(loops):
+                op()
+            best = min(best, time.perf_counter() - start)
+    finally:
+        sys.stdout = stdout
+        if hasattr(op, 'restore'):
+            op.restore()
+    return best / loops * 1e9
+
+
+def run(names=None, min_time=0.2, repeat=5):
+    results = {}
+    for name, factory in BENCHMARKS.items():
+        if names and not any(pattern in name for pattern in names):
+            continue
+        ns = measure(factory, min_time, repeat)
+        results[name] = {'ns_per_op': round(ns, 1), 'ops_per_sec': round(1e9 / ns, 1)}
+        print(f"{name:<24}{ns:>12,.0f} ns/op {1e9 / ns:>14,.0f} ops/s")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print the change against a baseline; returns the names that regressed"""
+    regressions = []
+    print(f"\n{'benchmark':<24}{'baseline':>12}{'now':>12}{'change':>10}")
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:<24}{'-':>12}{result['ns_per_op']:>12,.0f}{'new':>10}")
+            continue
+        change = result['ns_per_op'] / before['ns_per_op'] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<24}{before['ns_per_op']:>12,.0f}{result['ns_per_op']:>12,.0f}{change:>+10.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the game's hot paths")
+    parser.add_argument("-k", dest="names", action="append", help="only run benchmarks whose name contains this")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs per benchmark; the best one counts")
+    parser.add_argument("--save", help="write the results to this JSON baseline file")
+    parser.add_argument("--compare", help="compare against this JSON baseline file")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="slowdown that counts as a regression (0.25 = 25%% slower)")
+    args = parser.parse_args()
+
+    results = run(args.names, args.min_time, args.repeat)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'python': platform.python_version(), 'machine': platform.machine(),
+                       'results': results}, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}: "
+                  f"{', '.join(regressions)}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Pacing clock for the terminal game.
+
+Every pause in the game goes through a Clock instead of ``time.sleep``:
+
+- ``realtime``: sleeps for as long as asked, like before.
+- ``fast``: fast-forward, sleeps ``seconds / speed``.
+- ``turbo``: never sleeps; the game timeline advances instantly.
+
+In every mode the clock records the timeline it was asked for, so a turbo
+run still shows how long the same session would have taken at human speed.
+"""
+import time
+
+MODES = ('realtime', 'fast', 'turbo')
+
+
+class Clock:
+    def __init__(self, mode='realtime', speed=1.0):
+        self.timeline = []  # (game time, pause length) for every sleep
+        self.before_sleep = None  # Called before every real pause, e.g. to draw a frame
+        self.set_mode(mode, speed)
+
+    def set_mode(self, mode, speed=1.0):
+        if mode not in MODES:
+            raise ValueError(f"Unknown clock mode {mode!r}, expected one of: {', '.join(MODES)}")
+        if speed <= 0:
+            raise ValueError("Clock speed must be positive")
+        self.mode = mode
+        self.speed = speed
+        self.origin = time.time()
+        self.elapsed = 0.0  # Game time spent in sleeps since set_mode
+
+    def time(self):
+        """Current game time in seconds"""
+        if self.mode == 'realtime':
+            return time.time()
+        return self.origin + self.elapsed
+
+    def sleep(self, seconds):
+        self.timeline.append((self.time(), seconds))
+        self.elapsed += seconds
+        if self.mode != 'turbo' and self.before_sleep:
+            self.before_sleep()
+        if self.mode == 'realtime':
+            time.sleep(seconds)
+        elif self.mode == 'fast':
+            time.sleep(seconds / self.speed)
+
+    def total(self):
+        """Game time spent sleeping across the whole recorded timeline"""
+        return sum(seconds for _, seconds in self.timeline)
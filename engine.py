@@ -0,0 +1,842 @@
+"""Game rules for The Not-So-Russian-Roulette, without printing or sleeping.
+
+Every rule step reports what happened by handing an event to ``game.emit``.
+The terminal game in roulette.py is one consumer of those events; headless
+runs leave ``emit`` unset and play at full speed.
+"""
+import hashlib
+import json
+import random
+from collections import namedtuple
+
+from streams import Streams
+from tables import WeightedTable, load_weights
+
+# Events emitted while a game is played
+RoundStarted = namedtuple("RoundStarted", "turn")
+HazardStruck = namedtuple("HazardStruck", "name")
+HazardPassed = namedtuple("HazardPassed", "name")
+TurnStarted = namedtuple("TurnStarted", "player target")
+TurnSkipped = namedtuple("TurnSkipped", "player")
+ActionChosen = namedtuple("ActionChosen", "player choice")
+ChoiceFumbled = namedtuple("ChoiceFumbled", "player intended choice")
+TriggerPulled = namedtuple("TriggerPulled", "shooter target")
+Misfire = namedtuple("Misfire", "shooter")
+BulletFired = namedtuple("BulletFired", "shooter target bang")
+Damaged = namedtuple("Damaged", "player amount cause")
+ShieldAbsorbed = namedtuple("ShieldAbsorbed", "player cause")
+Reloaded = namedtuple("Reloaded", "bullets")
+EventSpun = namedtuple("EventSpun", "player name")
+LifeGained = namedtuple("LifeGained", "player cause")
+ShieldGained = namedtuple("ShieldGained", "player turns")
+MadeDrunk = namedtuple("MadeDrunk", "player turns")
+TurnLost = namedtuple("TurnLost", "player")
+GuestAction = namedtuple("GuestAction", "guest action")
+GuestJoined = namedtuple("GuestJoined", "player")
+DuelWon = namedtuple("DuelWon", "winner guest")
+Fizzled = namedtuple("Fizzled", "cause")
+TurnEnded = namedtuple("TurnEnded", "player")
+GameOver = namedtuple("GameOver", "winners")
+
+ACTIONS = ['1', '2', '3']
+
+# Balance knobs. RULES holds the ones in force; change them with set_rules() (see sweep.py).
+# hazard_cooldown is the (min, max) rounds without a hazard after one strikes.
+Rules = namedtuple('Rules', 'bullets lives misfire hazard_chance hazard_cooldown ai_finish ai_confident ai_gamble')
+DEFAULT_RULES = Rules(bullets=6, lives=3, misfire=0.1, hazard_chance=0.25, hazard_cooldown=(3, 5),
+                      ai_finish=0.7, ai_confident=0.4, ai_gamble=0.3)
+RULES = DEFAULT_RULES
+
+
+class Chamber:
+    """Bullets packed into an int: bit i set means bullet i goes bang"""
+
+    __slots__ = ('bits', 'size')
+
+    def __init__(self, bits, size):
+        self.bits = bits
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.size:
+            raise IndexError("chamber index out of range")
+        return (self.bits >> index) & 1
+
+    def __iter__(self):
+        bits = self.bits
+        for _ in range(self.size):
+            yield bits & 1
+            bits >>= 1
+
+    def __eq__(self, other):
+        if isinstance(other, Chamber):
+            return self.bits == other.bits and self.size == other.size
+        return list(self) == other
+
+    def __repr__(self):
+        return f"Chamber({list(self)})"
+
+    def popcount(self):
+        """Number of live rounds in the chamber"""
+        return bin(self.bits).count('1')
+
+    def remaining_bangs(self, start=0):
+        """Number of live rounds from position `start` onwards"""
+        return bin(self.bits >> start).count('1')
+
+    def next_bullet(self, start=0):
+        """Position of the next live round at or after `start`, or -1 if none is left"""
+        rest = self.bits >> start
+        if not rest:
+            return -1
+        return start + (rest & -rest).bit_length() - 1
+
+
+class ChamberBuffer:
+    """Many chambers packed back to back into one bytes buffer"""
+
+    __slots__ = ('data', 'count', 'size')
+
+    def __init__(self, data, count, size):
+        self.data = data
+        self.count = count
+        self.size = size
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError("chamber index out of range")
+        first = index * self.size
+        chunk = self.data[first >> 3:(first + self.size + 7) >> 3]
+        bits = (int.from_bytes(chunk, 'little') >> (first & 7)) & ((1 << self.size) - 1)
+        return Chamber(bits, self.size)
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self[index]
+
+
+class Roulette:
+    """Rolls chambers where every bullet has an even chance of going bang.
+
+    The old roll picked from range(50) and treated odd numbers as live
+    rounds, which is exactly one fair random bit per bullet.
+    """
+
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else random
+
+    def spin(self, bullet_count=6):
+        bits = self.rng.getrandbits(bullet_count) if bullet_count else 0
+        return Chamber(bits, bullet_count)
+
+    def spin_many(self, n, bullet_count=6):
+        total = n * bullet_count
+        bits = self.rng.getrandbits(total) if total else 0
+        return ChamberBuffer(bits.to_bytes((total + 7) // 8, 'little'), n, bullet_count)
+
+
+class Start:
+    def __init__(self, rng=None):
+        self.roulette = Roulette(rng)
+
+    def roll(self, bullet_count=6):
+        return self.roulette.spin(bullet_count)
+
+    def roll_many(self, n, bullet_count=6):
+        """Roll `n` chambers at once, packed into a ChamberBuffer"""
+        return self.roulette.spin_many(n, bullet_count)
+
+
+class Player:
+    __slots__ = ('name', 'lives', 'shield', 'shield_turns', 'drunk_turns', 'confused', 'misses_next_turn', 'seat')
+
+    def __init__(self, name, lives=3):
+        self.name = name
+        self.lives = lives
+        self.seat = None  # Index in game.players once seated
+        self.shield = False
+        self.shield_turns = 0
+        self.drunk_turns = 0
+        self.confused = False
+        self.misses_next_turn = False
+
+    def add_shield(self, turns=1):
+        self.shield = True
+        self.shield_turns = turns
+
+    def make_drunk(self, turns=2):
+        self.drunk_turns = turns
+        self.confused = True
+
+    def miss_next_turn(self):
+        self.misses_next_turn = True
+
+    def update_status(self):
+        if self.drunk_turns > 0:
+            self.drunk_turns -= 1
+            if self.drunk_turns == 0:
+                self.confused = False
+
+        # Reset missed turn flag after processing
+        self.misses_next_turn = False
+
+    def use_shield(self):
+        if self.shield and self.shield_turns > 0:
+            self.shield_turns -= 1
+            if self.shield_turns == 0:
+                self.shield = False
+            return True
+        return False
+
+    def take_damage(self, amount=1):
+        if self.use_shield():
+            return 0
+        self.lives -= amount
+        return amount
+
+    def is_alive(self):
+        return self.lives > 0
+
+    def copy(self):
+        clone = Player.__new__(Player)
+        for name in Player.__slots__:
+            setattr(clone, name, getattr(self, name))
+        return clone
+
+    def get_status(self):
+        status_parts = [f"{self.name}: {self.lives}"]
+        if self.shield:
+            status_parts.append(f"Shield({self.shield_turns})")
+        if self.confused:
+            status_parts.append("Drunk")
+        if self.misses_next_turn:
+            status_parts.append("Misses")
+        return " ".join(status_parts)
+
+
+class Ring:
+    """Seats still in the game, in seat order, as a circular doubly linked list.
+
+    Removing a seat and reading the alive count are O(1). A removed seat
+    keeps its own links, so the turn order can still step on from it.
+    """
+
+    __slots__ = ('next', 'prev', 'member', 'count')
+
+    def __init__(self, seats=0):
+        self.next = [(seat + 1) % seats for seat in range(seats)]
+        self.prev = [(seat - 1) % seats for seat in range(seats)]
+        self.member = [True] * seats
+        self.count = seats
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, seat):
+        return 0 <= seat < len(self.member) and self.member[seat]
+
+    def remove(self, seat):
+        if not self.member[seat]:
+            return
+        after, before = self.next[seat], self.prev[seat]
+        self.next[before] = after
+        self.prev[after] = before
+        self.member[seat] = False
+        self.count -= 1
+
+    def insert(self, seat):
+        """Add a new seat or put a removed one back; O(gap to the nearest seat below)"""
+        while len(self.member) <= seat:
+            new = len(self.member)
+            self.next.append(new)
+            self.prev.append(new)
+            self.member.append(False)
+        if self.member[seat]:
+            return
+        if self.count:
+            before = seat - 1  # Nearest member below, wrapping around
+            while not self.member[before]:
+                before -= 1
+            before %= len(self.member)
+            after = self.next[before]
+            self.prev[seat], self.next[seat] = before, after
+            self.next[before] = self.prev[after] = seat
+        else:
+            self.next[seat] = self.prev[seat] = seat
+        self.member[seat] = True
+        self.count += 1
+
+    def after(self, seat):
+        """Next member after `seat`, which may have been removed itself"""
+        following = self.next[seat]
+        while not self.member[following]:
+            following = self.next[following]
+        return following
+
+    def first(self):
+        return self.member.index(True)
+
+    def copy(self):
+        clone = Ring.__new__(Ring)
+        clone.next = list(self.next)
+        clone.prev = list(self.prev)
+        clone.member = list(self.member)
+        clone.count = self.count
+        return clone
+
+
+class GameState:
+    """Everything one match owns: seats, chamber, cursor, hazard cooldown and turn count.
+
+    Rule functions take the state explicitly, so any number of matches can
+    be played side by side in one process. A game built from a `seed` gets
+    one counter-based stream per subsystem in `streams` (see streams.py):
+    chamber rolls, misfires, events, hazards, other rule coin flips (`rng`)
+    and the AI (`ai_rng`), each jumping to a fixed position every round. A
+    game built from the same seed and fed the same choices therefore plays
+    out identically, whoever made them. A game given an ordinary `rng`
+    draws all its rules from that one generator instead.
+
+    `others` seats more players after the first two, for battle-royale
+    tables. `target(game, player)` picks who a player aims at (see TARGETS).
+    """
+
+    __slots__ = ('seed', 'streams', 'rng', 'ai_rng', 'emit', 'player1', 'player2', 'snoop', 'snoop_joined', 'seated',
+                 'players', 'ring', 'target', 'lives', 'bullet_count', 'start', 'bullets', 'current_bullet',
+                 'hazard_cooldown', 'turn_count', 'seat', 'over', 'winners')
+
+    def __init__(self, player_name, opponent_name, lives=None, bullet_count=None, rng=None, emit=None, seed=None,
+                 others=(), target=None):
+        lives = RULES.lives if lives is None else lives
+        bullet_count = RULES.bullets if bullet_count is None else bullet_count
+        if rng is None:
+            seed = seed if seed is not None else random.getrandbits(64)
+            self.streams = Streams(seed)
+        else:
+            self.streams = Streams.shared(rng)
+        self.seed = seed
+        self.rng = self.streams.rules
+        self.ai_rng = self.streams.ai
+        self.emit = emit
+        self.lives = lives  # Starting lives, for the seats and any guest who joins later
+        self.player1 = Player(player_name, lives)
+        self.player2 = Player(opponent_name, lives)
+        self.seated = [self.player1, self.player2] + [Player(name, lives) for name in others]
+        self.players = list(self.seated)  # Every seat in turn order; guests join at the end
+        for seat, player in enumerate(self.players):
+            player.seat = seat
+        self.ring = Ring(len(self.players))
+        self.target = target or default_target
+        self.snoop = None
+        self.snoop_joined = False
+        self.bullet_count = bullet_count
+        self.start = Start(self.streams.chamber)
+        self.bullets = self.start.roll(bullet_count)
+        self.current_bullet = 0
+        self.hazard_cooldown = 0
+        self.turn_count = 0
+        self.seat = -1  # Seat of the player who moved last
+        self.over = False
+        self.winners = []
+
+    def copy(self, rng=None, emit=None):
+        """Independent copy of this match, e.g. for look-ahead search"""
+        clone = GameState.__new__(GameState)
+        for name in GameState.__slots__:
+            setattr(clone, name, getattr(self, name))
+        clone.rng = clone.ai_rng = rng if rng is not None else random.Random()
+        clone.streams = Streams.shared(clone.rng)
+        clone.streams.ai = clone.rng
+        clone.emit = emit
+        clone.start = Start(clone.rng)
+        clone.players = [p.copy() for p in self.players]
+        clone.seated = clone.players[:len(self.seated)]
+        clone.player1, clone.player2 = clone.players[0], clone.players[1]
+        clone.snoop = clone.players[self.snoop.seat] if self.snoop else None
+        clone.ring = self.ring.copy()
+        clone.winners = [clone.players[p.seat] for p in self.winners]
+        return clone
+
+    def seat_of(self, player):
+        """Index of `player` in game.players"""
+        return player.seat
+
+    def player_at(self, seat):
+        return self.players[seat]
+
+
+def hit(game, player, amount, cause):
+    """Deal damage through the player's shield and report the outcome"""
+    damage = player.take_damage(amount)
+    if damage and player.lives <= 0:
+        game.ring.remove(player.seat)
+    if game.emit:
+        if damage:
+            game.emit(Damaged(player, damage, cause))
+        else:
+            game.emit(ShieldAbsorbed(player, cause))
+    return damage
+
+
+def heal(game, player, cause):
+    player.lives += 1
+    if player.lives > 0:
+        game.ring.insert(player.seat)
+    if game.emit:
+        game.emit(LifeGained(player, cause))
+
+
+def seat_guest(game, player):
+    """Seat a guest after everyone else"""
+    player.seat = len(game.players)
+    game.players.append(player)
+    game.ring.insert(player.seat)
+
+
+def alive_players(game):
+    member = game.ring.member
+    return [p for p in game.players if member[p.seat]]
+
+
+def alive_seated(game):
+    """Players seated at the start who are still in the game, in seat order"""
+    member = game.ring.member
+    return [p for p in game.seated if member[p.seat]]
+
+
+def check_game_over(game):
+    """(game over, survivors); survivors are only listed once the game is over"""
+    if game.ring.count > 1:
+        return False, []
+    return True, alive_players(game)
+
+
+def finish(game, winners):
+    game.over = True
+    game.winners = winners
+    if game.emit:
+        game.emit(GameOver(winners))
+
+
+def reload(game):
+    game.bullets = game.start.roll(game.bullet_count)
+    game.current_bullet = 0
+    if game.emit:
+        game.emit(Reloaded(game.bullets))
+
+
+# Environmental hazards
+
+def lightning_storm_effect(game):
+    """Lightning randomly strikes players"""
+    targets = alive_players(game)
+    if targets:
+        target = game.streams.hazard.choice(targets)
+        hit(game, target, 1, 'lightning')
+
+
+def gas_leak_effect(game):
+    """Gas leak makes players drunk"""
+    rng = game.streams.hazard
+    for target in alive_players(game):
+        if rng.random() < 0.7:  # 70% chance to affect each player
+            turns = rng.randint(1, 3)
+            target.make_drunk(turns)
+            if game.emit:
+                game.emit(MadeDrunk(target, turns))
+
+
+def power_outage_effect(game):
+    """Power outage causes confusion and missed turns"""
+    targets = alive_players(game)
+    if targets and game.streams.hazard.random() < 0.4:
+        target = game.streams.hazard.choice(targets)
+        target.miss_next_turn()
+        if game.emit:
+            game.emit(TurnLost(target))
+
+
+def earthquake_effect(game):
+    """Earthquake causes random damage to all"""
+    for player in alive_players(game):
+        if game.streams.hazard.random() < 0.6:  # 60% chance to take damage
+            hit(game, player, 1, 'quake')
+
+
+def toxic_rain_effect(game):
+    """Toxic rain damages everyone over time"""
+    for player in alive_players(game):
+        hit(game, player, 1, 'toxic_rain')
+
+
+HAZARDS = WeightedTable([
+    ("Lightning Storm", lightning_storm_effect),
+    ("Gas Leak", gas_leak_effect),
+    ("Power Outage", power_outage_effect),
+    ("Earthquake", earthquake_effect),
+    ("Toxic Rain", toxic_rain_effect),
+])
+
+
+def environmental_hazard(game):
+    """Random environmental hazard affecting all players"""
+    name, effect = HAZARDS.sample(game.streams.hazard)
+    if game.emit:
+        game.emit(HazardStruck(name))
+    effect(game)
+    return name
+
+
+# Event wheel
+
+def mysterious_man_event(game):
+    if game.snoop_joined and game.snoop and game.snoop.is_alive():
+        target = game.streams.event.choice(alive_seated(game) + [game.snoop])
+    else:
+        target = game.streams.event.choice(alive_seated(game))
+    hit(game, target, 2, 'mysterious_man')
+
+
+def nothing_event(game):
+    pass
+
+
+def potion_event(game):
+    seated = alive_seated(game)
+    potion_type = game.streams.event.randint(1, len(seated) + 1)
+    if potion_type <= len(seated):
+        player = seated[potion_type - 1]
+        heal(game, player, 'potion' if player is game.player1 else 'thrown_potion')
+    elif game.emit:
+        game.emit(Fizzled('potion'))
+
+
+def earthquake_event(game):
+    for player in alive_seated(game):
+        hit(game, player, 1, 'earthquake')
+
+
+def animal_event(game):
+    target = game.streams.event.choice(alive_seated(game))
+    hit(game, target, 1, 'animal')
+
+
+def shield_event(game):
+    shield_target = game.streams.event.choice(alive_seated(game))
+    turns = game.streams.event.randint(1, 2)
+    shield_target.add_shield(turns)
+    if game.emit:
+        game.emit(ShieldGained(shield_target, turns))
+
+
+def snoop_dogg_event(game):
+    rng = game.streams.event
+    emit = game.emit
+    seated, snoop = alive_seated(game), game.snoop
+
+    if not game.snoop_joined:
+        event_type = rng.randint(1, 4)
+        if event_type == 1:
+            if emit:
+                emit(GuestAction('snoop', 'fallout'))
+            target = rng.choice(seated)
+            hit(game, target, 1, 'snoop_fallout')
+        elif event_type == 2:
+            if emit:
+                emit(GuestAction('snoop', 'shoots'))
+            for player in seated:
+                hit(game, player, 1, 'snoop_shot')
+        elif event_type == 3:
+            if emit:
+                emit(GuestAction('snoop', 'duel'))
+            winner = rng.choice(seated)
+            if emit:
+                emit(DuelWon(winner, 'snoop'))
+            if snoop:
+                hit(game, snoop, 1, 'duel')
+        else:
+            game.snoop_joined = True
+            if not snoop:
+                game.snoop = Player("Snoop Dogg", game.lives)
+                seat_guest(game, game.snoop)
+            if emit:
+                emit(GuestJoined(game.snoop))
+    else:
+        everyone = alive_players(game)  # The living seats and Snoop, if he is still standing
+        event_type = rng.randint(1, 3)
+        if event_type == 1:
+            if emit:
+                emit(GuestAction('miku', 'fallout'))
+            target = rng.choice(everyone)
+            hit(game, target, 1, 'miku_fallout')
+        elif event_type == 2:
+            if emit:
+                emit(GuestAction('miku', 'shoots'))
+            for player in everyone:
+                hit(game, player, 1, 'miku_shot')
+        else:
+            if emit:
+                emit(GuestAction('miku', 'duel'))
+            winner = rng.choice(everyone)
+            if emit:
+                emit(DuelWon(winner, 'miku'))
+
+
+EVENTS = WeightedTable([
+    ("mysterious_man", mysterious_man_event),
+    ("nothing", nothing_event),
+    ("potion", potion_event),
+    ("earthquake", earthquake_event),
+    ("animal", animal_event),
+    ("shield", shield_event),
+    ("snoop_dogg", snoop_dogg_event),
+])
+
+
+def set_weights(config):
+    """Apply {"events": {...}, "hazards": {...}} weights to the event and hazard tables"""
+    EVENTS.set_weights(config.get("events", {}))
+    HAZARDS.set_weights(config.get("hazards", {}))
+
+
+def weights_digest():
+    """Fingerprint of the current event and hazard weights"""
+    weights = {"events": EVENTS.probabilities(), "hazards": HAZARDS.probabilities()}
+    return hashlib.sha1(json.dumps(weights).encode()).digest()
+
+
+def set_rules(config):
+    """Put the {knob: value} overrides in `config` on top of DEFAULT_RULES; returns the new RULES"""
+    global RULES
+    unknown = set(config) - set(Rules._fields)
+    if unknown:
+        raise ValueError(f"Unknown rule {sorted(unknown)[0]!r}, expected one of: {', '.join(Rules._fields)}")
+    rules = DEFAULT_RULES._replace(**config)
+    if rules.bullets < 1 or rules.lives < 1:
+        raise ValueError("bullets and lives must be at least 1")
+    if not all(0 <= chance <= 1 for chance in (rules.misfire, rules.hazard_chance, rules.ai_finish,
+                                                rules.ai_confident, rules.ai_gamble)):
+        raise ValueError("Chances must be between 0 and 1")
+    low, high = rules.hazard_cooldown
+    if not 0 <= low <= high:
+        raise ValueError("hazard_cooldown must be a (min, max) pair with 0 <= min <= max")
+    RULES = rules._replace(hazard_cooldown=(low, high))
+    return RULES
+
+
+def reload_weights(path):
+    """Load event and hazard weights from a JSON config file"""
+    config = load_weights(path)
+    set_weights(config)
+    return config
+
+
+def spin_event(game, player=None):
+    name, event = EVENTS.sample(game.streams.event)
+    if name == "snoop_dogg" and game.snoop_joined:
+        name = "hatsune_miku"
+    if game.emit:
+        game.emit(EventSpun(player, name))
+    event(game)
+    return name
+
+
+# Target choice
+
+def default_target(game, player):
+    """The classic table: two players face each other, guests aim at a random player"""
+    seated = game.seated
+    if player.seat >= len(seated):
+        return game.rng.choice(alive_seated(game))
+    if len(seated) == 2:
+        return seated[1 - player.seat]
+    return next_target(game, player)
+
+
+def next_target(game, player):
+    """Whoever sits next in the turn order"""
+    return game.players[game.ring.after(player.seat)]
+
+
+def random_target(game, player):
+    """Any other player still in the game"""
+    member = game.ring.member
+    return game.rng.choice([p for p in game.players if member[p.seat] and p is not player])
+
+
+def weakest_target(game, player):
+    """The player with the fewest lives, first in turn order on a tie"""
+    member = game.ring.member
+    return min((p for p in game.players if member[p.seat] and p is not player), key=lambda p: p.lives)
+
+
+TARGETS = {
+    'default': default_target,
+    'next': next_target,
+    'random': random_target,
+    'weakest': weakest_target,
+}
+
+
+# Turns
+
+def ai_decision_maker(ai_player, target_player, rng=random):
+    """Make strategic decision for AI player"""
+    if ai_player.confused:
+        # Drunk AI makes random choices
+        return rng.choice(ACTIONS)
+
+    # Strategic decision making
+    if ai_player.lives <= 1:
+        # Desperate - try special event for potential help
+        return '3'
+    elif target_player.lives <= 1 and rng.random() < RULES.ai_finish:
+        # Finish off weak opponent
+        return '2'
+    elif ai_player.lives >= 3 and rng.random() < RULES.ai_confident:
+        # Healthy and confident - shoot opponent
+        return '2'
+    elif rng.random() < RULES.ai_gamble:
+        # Occasionally try special event
+        return '3'
+    else:
+        # Default to self-shot (safer)
+        return '1'
+
+
+def handle_trigger_pull(game, shooter, target):
+    if game.current_bullet >= len(game.bullets):
+        reload(game)
+
+    # Check for misfire
+    if game.streams.misfire.random() < RULES.misfire:
+        if game.emit:
+            game.emit(Misfire(shooter))
+        return  # Bullet not consumed
+
+    bang = game.bullets[game.current_bullet]
+    if game.emit:
+        game.emit(BulletFired(shooter, target, bang))
+    if bang:
+        if target:
+            hit(game, target, 1, 'shot')
+        else:
+            hit(game, shooter, 1, 'self')
+    game.current_bullet += 1
+
+
+def begin_round(game):
+    """Start a new round, rolling for an environmental hazard first"""
+    game.turn_count += 1
+    game.streams.seek(game.turn_count)
+    if game.emit:
+        game.emit(RoundStarted(game.turn_count))
+
+    # Environmental hazard check (every 3-5 turns)
+    hazard_rng = game.streams.hazard
+    if game.hazard_cooldown <= 0 and hazard_rng.random() < RULES.hazard_chance:
+        name = environmental_hazard(game)
+        game.hazard_cooldown = hazard_rng.randint(*RULES.hazard_cooldown)
+        if game.emit:
+            game.emit(HazardPassed(name))
+    else:
+        game.hazard_cooldown = max(0, game.hazard_cooldown - 1)
+
+
+def end_turn(game, player):
+    player.update_status()
+
+    # Check if we need to reload
+    if game.current_bullet >= len(game.bullets):
+        reload(game)
+
+    game_over, alive = check_game_over(game)
+    if game_over:
+        finish(game, alive)
+    elif game.emit:
+        game.emit(TurnEnded(player))
+
+
+def next_turn(game):
+    """Advance to the next player who has to choose an action.
+
+    Seats take turns in ring order, skipping anyone eliminated. Passing the
+    first seat again starts a new round, which may bring a hazard. Missed
+    turns are resolved along the way. Returns (player, target), or None once
+    the game is over.
+    """
+    ring = game.ring
+    while not game.over:
+        last = game.seat
+        seat = ring.after(last) if last >= 0 else ring.first()
+        if seat <= last or last < 0:
+            begin_round(game)
+            game_over, alive = check_game_over(game)
+            if game_over:
+                finish(game, alive)
+                break
+            seat = ring.after(last) if last >= 0 else ring.first()
+        game.seat = seat
+        player = game.players[seat]
+        target = game.target(game, player)
+
+        if game.emit:
+            game.emit(TurnStarted(player, target))
+        if player.misses_next_turn:
+            if game.emit:
+                game.emit(TurnSkipped(player))
+            end_turn(game, player)
+            continue
+        return player, target
+    return None
+
+
+def player_turn(game, player, target, choice):
+    """Resolve the chosen action ('1', '2' or '3') for the current player"""
+    rng = game.rng
+    if game.emit:
+        game.emit(ActionChosen(player, choice))
+
+    # Apply drunk effect to choice
+    if player.confused and rng.random() < 0.4:  # 40% chance to mess up choice
+        original_choice = choice
+        choices = list(ACTIONS)
+        if original_choice in choices:
+            choices.remove(original_choice)
+        choice = rng.choice(choices)
+        if game.emit:
+            game.emit(ChoiceFumbled(player, original_choice, choice))
+
+    if choice == '1':
+        if game.emit:
+            game.emit(TriggerPulled(player, None))
+        handle_trigger_pull(game, player, None)
+    elif choice == '2':
+        if game.emit:
+            game.emit(TriggerPulled(player, target))
+        handle_trigger_pull(game, player, target)
+    else:
+        # Special event costs the player's turn but doesn't use a bullet
+        spin_event(game, player)
+
+    end_turn(game, player)
+
+
+def ai_decide(game, player, target):
+    return ai_decision_maker(player, target, game.ai_rng)
+
+
+def play(game, decide=ai_decide):
+    """Play a whole game; decide(game, player, target) returns '1', '2' or '3'"""
+    while True:
+        turn = next_turn(game)
+        if turn is None:
+            return game.winners
+        player, target = turn
+        player_turn(game, player, target, decide(game, player, target))
@@ -0,0 +1,93 @@
+"""Keyboard input for a whole game session.
+
+The terminal is switched to character-at-a-time mode once, when the
+session starts, instead of on every keypress. Input is polled with
+``selectors`` (``msvcrt.kbhit`` on Windows), and every key pressed is
+queued, including keys typed while an animation is playing. The next
+prompt takes them straight from the queue, and animations can check
+``pending()`` to finish early when the player is typing ahead.
+
+The terminal mode only changes inside ``with session:``. Outside it,
+``getch()`` raises RuntimeError and ``pending()`` reports only keys already
+queued, so a stray animation can never leave the terminal in cbreak mode.
+"""
+import os
+import sys
+from collections import deque
+
+try:
+    import msvcrt  # Windows
+except ImportError:
+    msvcrt = None
+    import selectors
+    import termios
+    import tty
+
+
+class InputSession:
+    def __init__(self, stream=None):
+        self.stream = stream
+        self.keys = deque()
+        self.closed = False
+        self.fd = None
+        self.saved = None
+        self.selector = None
+
+    def __enter__(self):
+        stream = self.stream or sys.stdin
+        if msvcrt is None:
+            self.fd = stream.fileno()
+            if os.isatty(self.fd):
+                self.saved = termios.tcgetattr(self.fd)
+                # cbreak: keys arrive one at a time without echo, Ctrl-C still interrupts
+                tty.setcbreak(self.fd, termios.TCSANOW)
+            self.selector = selectors.DefaultSelector()
+            self.selector.register(self.fd, selectors.EVENT_READ)
+        return self
+
+    def __exit__(self, *exc):
+        if self.selector:
+            self.selector.close()
+            self.selector = None
+        if self.saved is not None:
+            termios.tcsetattr(self.fd, termios.TCSADRAIN, self.saved)
+            self.saved = None
+        return False
+
+    def poll(self, timeout=0):
+        """Queue any keys that arrive within `timeout` seconds (None waits for one)"""
+        if msvcrt is not None:
+            if timeout is None and not msvcrt.kbhit():
+                self.keys.append(msvcrt.getwch())
+            while msvcrt.kbhit():
+                self.keys.append(msvcrt.getwch())
+            return bool(self.keys)
+
+        if self.selector is None:
+            raise RuntimeError("Keys can only be read inside the input session (with KEYS: ...)")
+        while not self.closed and self.selector.select(timeout):
+            data = os.read(self.fd, 1024)
+            if not data:
+                self.closed = True
+                break
+            self.keys.extend(data.decode(errors='ignore'))
+            timeout = 0
+        return bool(self.keys)
+
+    def active(self):
+        return msvcrt is not None or self.selector is not None
+
+    def pending(self):
+        """True if the player has typed ahead; outside the session only already queued keys count"""
+        return bool(self.keys) or (self.active() and self.poll())
+
+    def getch(self):
+        """Next key, from the type-ahead queue if there is one"""
+        while not self.keys:
+            if self.closed:
+                raise EOFError
+            self.poll(None)
+        key = self.keys.popleft()
+        if key == '\x03':
+            raise KeyboardInterrupt
+        return key
@@ -0,0 +1,159 @@
+"""Monte Carlo tree search AI.
+
+For every move the AI plays as many fast headless rollouts as fit in its
+time budget (20 ms by default). It picks among its own actions with UCB1
+and models the other seats with ``ai_decision_maker``. Statistics are
+stored per situation in a bounded transposition table keyed by what a
+player at the table can see: lives, shield turns, drunk turns and missed
+turns for each seat, plus how many rounds are left in the chamber. The
+table lives on the AI object, so the search tree carries over from one
+turn to the next.
+
+A time budget makes moves depend on how fast the machine is. With
+``rollouts`` set instead, every move plays exactly that many rollouts,
+drawn from a generator reseeded from the game's AI stream, and
+``new_game()`` clears the table between games. The same game then always
+gets the same moves, which tournaments rely on.
+
+The AI does not peek at the chamber. Every rollout re-rolls the rounds
+that have not been fired yet.
+"""
+import math
+import random
+import time
+from collections import OrderedDict
+
+import engine
+from engine import ACTIONS, Chamber, ai_decision_maker
+from strategies import Strategy
+
+MAX_ROLLOUT_TURNS = 200
+
+
+class Node:
+    """Search statistics for one situation, from the deciding player's point of view"""
+
+    __slots__ = ('visits', 'action_visits', 'action_wins')
+
+    def __init__(self):
+        self.visits = 0
+        self.action_visits = [0, 0, 0]
+        self.action_wins = [0.0, 0.0, 0.0]
+
+
+def situation_key(game, player):
+    """What `player` can see of the game, with their own seat first"""
+    others = [p for p in game.players if p is not player]
+    seats = tuple((p.lives, p.shield_turns, p.drunk_turns, p.misses_next_turn) for p in [player] + others)
+    return seats, len(game.bullets) - game.current_bullet
+
+
+class MCTSAI(Strategy):
+    """Searches every decision on its own; there is no batched form"""
+
+    name = 'mcts'
+
+    def __init__(self, budget=0.02, table_size=200000, exploration=1.4, seed=None, rollouts=None):
+        self.budget = budget
+        self.rollouts = rollouts  # Fixed rollouts per move instead of the time budget
+        self.table_size = table_size
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.table = OrderedDict()  # situation key -> Node, least recently used first
+
+    def new_game(self):
+        """Forget the search tree of earlier games"""
+        self.table.clear()
+
+    def node(self, key, create=False):
+        node = self.table.get(key)
+        if node is not None:
+            self.table.move_to_end(key)
+        elif create:
+            node = self.table[key] = Node()
+            if len(self.table) > self.table_size:
+                self.table.popitem(last=False)
+        return node
+
+    def choose(self, node):
+        """UCB1 over the three actions"""
+        for action, visits in enumerate(node.action_visits):
+            if not visits:
+                return action
+        log_visits = math.log(node.visits)
+        best, best_score = 0, -1.0
+        for action in range(3):
+            visits = node.action_visits[action]
+            score = node.action_wins[action] / visits + self.exploration * math.sqrt(log_visits / visits)
+            if score > best_score:
+                best, best_score = action, score
+        return best
+
+    def determinize(self, game):
+        """Copy of the game with the unfired rounds re-rolled"""
+        rng = self.rng
+        clone = game.copy(rng)
+        fired = clone.current_bullet
+        size = len(clone.bullets)
+        if fired < size:
+            known = clone.bullets.bits & ((1 << fired) - 1)
+            clone.bullets = Chamber(known | (rng.getrandbits(size - fired) << fired), size)
+        return clone
+
+    def rollout(self, game, seat, target_seat):
+        """Play one game out from a decision of the player in `seat`; returns the reward and path"""
+        path = []
+        expanded = False
+        player = game.player_at(seat)
+        target = game.player_at(target_seat)
+        for _ in range(MAX_ROLLOUT_TURNS):
+            if player is game.player_at(seat):
+                key = situation_key(game, player)
+                node = self.node(key)
+                if node is None and not expanded:
+                    # Grow the tree by one new situation per rollout
+                    node = self.node(key, create=True)
+                    expanded = True
+                if node is not None:
+                    action = self.choose(node)
+                    path.append((key, action))
+                    choice = ACTIONS[action]
+                else:
+                    choice = ai_decision_maker(player, target, game.ai_rng)
+            else:
+                choice = ai_decision_maker(player, target, game.ai_rng)
+            engine.player_turn(game, player, target, choice)
+            turn = engine.next_turn(game)
+            if turn is None:
+                break
+            player, target = turn
+
+        me = game.player_at(seat)
+        reward = 1.0 if game.over and game.winners == [me] else 0.0
+        return reward, path
+
+    def decide(self, game, player, target):
+        seat = game.seat_of(player)
+        target_seat = game.seat_of(target)
+        deadline = time.perf_counter() + self.budget
+        left = self.rollouts
+        if left:
+            self.rng.seed(game.ai_rng.getrandbits(64))
+        root = self.node(situation_key(game, player), create=True)
+        while True:
+            reward, path = self.rollout(self.determinize(game), seat, target_seat)
+            for key, action in path:
+                node = self.table.get(key)
+                if node is None:
+                    continue
+                node.visits += 1
+                node.action_visits[action] += 1
+                node.action_wins[action] += reward
+            if left:
+                left -= 1
+                if not left:
+                    break
+            elif time.perf_counter() >= deadline:
+                break
+        best = max(range(3), key=lambda action: root.action_visits[action])
+        return ACTIONS[best]
@@ -0,0 +1,202 @@
+"""Per-phase timing and game counters, exported as Prometheus text or JSON.
+
+Nothing is measured until a Metrics object is installed: while it is,
+the rule functions for each phase of a turn are swapped for timed
+wrappers, and they are put back when it is uninstalled. A disabled run
+therefore executes exactly the same code as before. Phase times are
+exclusive: a trigger pull that triggers narration is charged to 'trigger'
+for the rules and to 'render' for the narration. Nesting is tracked per
+thread, so narration played on a render thread is timed on its own.
+
+Counters are read from the engine's events, by tapping ``game.emit`` of
+every game passed to ``attach``. Only those games are timed, too: the rule
+functions run untimed for any other game, such as the copies an AI plays
+out while it searches for a move.
+
+    metrics = Metrics()
+    with metrics.installed():
+        game = GameState("A", "B")
+        metrics.attach(game)
+        engine.play(game, metrics.timed('decision', engine.ai_decide))
+    metrics.write("roulette.prom")   # or roulette.json
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+import engine
+
+PHASES = ('hazard', 'decision', 'trigger', 'event', 'status', 'render')
+
+# Rule functions timed as each phase while metrics are installed
+ENGINE_PHASES = (
+    ('begin_round', 'hazard'),
+    ('handle_trigger_pull', 'trigger'),
+    ('spin_event', 'event'),
+    ('end_turn', 'status'),
+)
+
+
+class Metrics:
+    def __init__(self):
+        self.phases = {phase: [0, 0.0] for phase in PHASES}  # phase -> [calls, exclusive seconds]
+        self.counters = Counter()
+        self.events = Counter()
+        self.hazards = Counter()
+        self.local = threading.local()  # .nested: time spent in timed calls made by the one running
+        self.patched = []
+        self.games = set()  # Attached games still being played
+
+    def timed(self, phase, func, games=None):
+        """Wrap `func` so its calls are counted and timed as `phase`
+
+        With `games`, a set of games, only calls whose first argument is one of them are timed.
+        """
+        stats = self.phases.setdefault(phase, [0, 0.0])
+        clock = time.perf_counter
+        local = self.local
+
+        def wrapper(*args, **kwargs):
+            if games is not None and args[0] not in games:
+                return func(*args, **kwargs)
+            outer = getattr(local, 'nested', 0.0)
+            local.nested = 0.0
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                stats[0] += 1
+                stats[1] += elapsed - local.nested
+                local.nested = outer + elapsed
+        wrapper.__wrapped__ = func
+        return wrapper
+
+    def patch(self, owner, name, phase, games=None):
+        """Time `owner.name` as `phase` until uninstall()"""
+        original = getattr(owner, name)
+        self.patched.append((owner, name, original))
+        setattr(owner, name, self.timed(phase, original, games))
+
+    def install(self):
+        for name, phase in ENGINE_PHASES:
+            self.patch(engine, name, phase, self.games)
+        return self
+
+    def uninstall(self):
+        while self.patched:
+            owner, name, original = self.patched.pop()
+            setattr(owner, name, original)
+
+    @contextmanager
+    def installed(self):
+        self.install()
+        try:
+            yield self
+        finally:
+            self.uninstall()
+
+    def attach(self, game):
+        """Count the events of `game` and time its rules, passing events on to its existing emit"""
+        downstream = game.emit
+        games = self.games
+
+        def emit(event):
+            self.observe(event)
+            if type(event) is engine.GameOver:
+                games.discard(game)
+            if downstream:
+                downstream(event)
+        game.emit = emit
+        games.add(game)
+        return game
+
+    def observe(self, event):
+        kind = type(event)
+        if kind is engine.Misfire:
+            self.counters['misfires'] += 1
+        elif kind is engine.ShieldAbsorbed:
+            self.counters['shield_blocks'] += 1
+        elif kind is engine.Reloaded:
+            self.counters['reloads'] += 1
+        elif kind is engine.EventSpun:
+            self.events[event.name] += 1
+        elif kind is engine.HazardStruck:
+            self.hazards[event.name] += 1
+        elif kind is engine.Damaged:
+            self.counters['damage'] += event.amount
+        elif kind is engine.TurnStarted:
+            self.counters['turns'] += 1
+        elif kind is engine.GameOver:
+            self.counters['games'] += 1
+
+    def as_dict(self):
+        # dict() copies are atomic, so an exporter thread gets a consistent snapshot
+        return {
+            'phases': {phase: {'calls': calls, 'seconds': seconds}
+                       for phase, (calls, seconds) in dict(self.phases).items()},
+            'counters': dict(self.counters),
+            'events': dict(self.events),
+            'hazards': dict(self.hazards),
+        }
+
+    def merge(self, data):
+        """Add in a snapshot from as_dict(), e.g. from another worker process"""
+        for phase, stats in data['phases'].items():
+            mine = self.phases.setdefault(phase, [0, 0.0])
+            mine[0] += stats['calls']
+            mine[1] += stats['seconds']
+        self.counters.update(data['counters'])
+        self.events.update(data['events'])
+        self.hazards.update(data['hazards'])
+
+    def prometheus(self):
+        """Prometheus text exposition format"""
+        data = self.as_dict()
+        lines = [
+            "# HELP roulette_phase_seconds_total Time spent in each phase of a turn.",
+            "# TYPE roulette_phase_seconds_total counter",
+        ]
+        lines += [f'roulette_phase_seconds_total{{phase="{phase}"}} {stats["seconds"]:.9f}'
+                  for phase, stats in data['phases'].items()]
+        lines += [
+            "# HELP roulette_phase_calls_total Times each phase of a turn ran.",
+            "# TYPE roulette_phase_calls_total counter",
+        ]
+        lines += [f'roulette_phase_calls_total{{phase="{phase}"}} {stats["calls"]}'
+                  for phase, stats in data['phases'].items()]
+        for name in ('games', 'turns', 'misfires', 'shield_blocks', 'reloads', 'damage'):
+            lines.append(f"# TYPE roulette_{name}_total counter")
+            lines.append(f"roulette_{name}_total {data['counters'].get(name, 0)}")
+        lines.append("# TYPE roulette_events_total counter")
+        lines += [f'roulette_events_total{{event="{name}"}} {count}'
+                  for name, count in sorted(data['events'].items())]
+        lines.append("# TYPE roulette_hazards_total counter")
+        lines += [f'roulette_hazards_total{{hazard="{name}"}} {count}'
+                  for name, count in sorted(data['hazards'].items())]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write a snapshot; JSON for a .json path, Prometheus text otherwise"""
+        if path.endswith('.json'):
+            text = json.dumps(self.as_dict(), indent=2) + "\n"
+        else:
+            text = self.prometheus()
+        temp = f"{path}.tmp"
+        with open(temp, 'w') as f:
+            f.write(text)
+        os.replace(temp, path)  # Scrapers never see a half-written file
+
+    def export(self, path, interval=None):
+        """Write to `path` at exit, and every `interval` seconds if given"""
+        atexit.register(self.write, path)
+        if interval:
+            def loop():
+                while True:
+                    time.sleep(interval)
+                    self.write(path)
+            threading.Thread(target=loop, name="metrics-export", daemon=True).start()
@@ -0,0 +1,115 @@
+"""Double-buffered terminal renderer.
+
+The screen is built off-screen as a list of lines: the status panel, the
+chamber row and a scrolling message log with the line being typed at the
+bottom. ``present()`` compares that frame with what the terminal shows and
+writes only the changed cells, using ANSI cursor moves, in one buffered
+write.
+
+The renderer is also a file-like object, so ordinary ``print`` calls land
+in the message log. Carriage returns and backspaces behave as they would on
+a terminal, which keeps spinners and progress bars working unchanged.
+"""
+import os
+import shutil
+import sys
+from collections import deque
+from contextlib import contextmanager, redirect_stdout
+
+
+class Renderer:
+    def __init__(self, out=None, history=200):
+        self.out = out
+        self.panel = []  # Status panel lines, pinned to the top of the screen
+        self.chamber = ""  # Chamber row, pinned under the panel
+        self.log = deque(maxlen=history)  # Finished message lines
+        self.line = ""  # Line currently being written
+        self.column = 0
+        self.shown = []  # Frame currently on the terminal
+
+    # File-like interface so print() writes into the message log
+
+    def write(self, text):
+        start = 0
+        for index, char in enumerate(text):
+            if char in '\n\r\b':
+                self._put(text[start:index])
+                if char == '\n':
+                    self.log.append(self.line.rstrip())
+                    self.line = ""
+                    self.column = 0
+                elif char == '\r':
+                    self.column = 0
+                else:
+                    self.column = max(0, self.column - 1)
+                start = index + 1
+        self._put(text[start:])
+        return len(text)
+
+    def _put(self, text):
+        if text:
+            column = self.column
+            self.line = self.line[:column].ljust(column) + text + self.line[column + len(text):]
+            self.column = column + len(text)
+
+    def flush(self):
+        # Frames are presented at pacing points (pauses and input), not on every print
+        pass
+
+    def clear(self):
+        """Wipe the message log, like clearing the console"""
+        self.log.clear()
+        self.line = ""
+        self.column = 0
+
+    # Frame composition and diffed output
+
+    def compose(self):
+        columns, rows = shutil.get_terminal_size()
+        top = list(self.panel)
+        if self.chamber:
+            top += [self.chamber, ""]
+        room = max(1, rows - len(top) - 1)
+        messages = list(self.log)[-room:] if room > 0 else []
+        return [line[:columns - 1] for line in top + messages + [self.line.rstrip()]]
+
+    def present(self):
+        """Write the changes since the last frame to the terminal"""
+        out = self.out or sys.stdout
+        frame = self.compose()
+        shown = self.shown
+        parts = []
+        for row in range(max(len(frame), len(shown))):
+            new = frame[row] if row < len(frame) else ""
+            old = shown[row] if row < len(shown) else ""
+            if new == old:
+                continue
+            same = len(os.path.commonprefix([new, old]))
+            parts.append(f"\x1b[{row + 1};{same + 1}H{new[same:]}")
+            if len(new) < len(old):
+                parts.append("\x1b[K")
+        if parts:
+            parts.append(f"\x1b[{len(frame)};{len(frame[-1]) + 1}H")
+            out.write("".join(parts))
+            out.flush()
+        self.shown = frame
+
+    @contextmanager
+    def attached(self, clock=None):
+        """Send print() output through the renderer and redraw at every pause"""
+        out = self.out = sys.stdout
+        if os.name == 'nt':
+            os.system('')  # Enables ANSI escape sequences in the Windows console
+        out.write("\x1b[2J\x1b[H")
+        self.shown = []
+        if clock:
+            clock.before_sleep = self.present
+        try:
+            with redirect_stdout(self):
+                yield self
+        finally:
+            if clock:
+                clock.before_sleep = None
+            self.present()
+            out.write("\n")
+            out.flush()
@@ -0,0 +1,241 @@
+"""Compact binary replay logs.
+
+A game is fully determined by its seed and the choices made at each
+turn, because the rules draw only from the game's own RNG. A replay
+record stores just that: a small header (seed, lives, chamber size, a
+fingerprint of the event/hazard weights, both names) followed by the
+choices packed four to a byte. Records are appended back to back, so one
+file can hold any number of games.
+
+    python roulette.py --record games.rrp      # record a live game
+    python simulate.py -n 100000 --record games.rrp
+    python replay.py games.rrp                 # re-run every game at full speed
+    python replay.py games.rrp --watch 0       # watch the first game with animations
+    python replay.py games.rrp --watch 0 --from-round 5
+
+Seeking is cheap: the game is played headless up to the round asked for,
+and every round's random draws start at a fixed stream position (see
+streams.py), so the rounds watched are exactly the rounds recorded.
+"""
+import argparse
+import struct
+import time
+from collections import Counter, namedtuple
+
+import engine
+from engine import ACTIONS, GameState
+
+MAGIC = b"RP"
+VERSION = 5
+HEADER = struct.Struct("<2sBQBB8sH")  # magic, version, seed, lives, chamber size, weights digest, turns
+CODES = {choice: code for code, choice in enumerate(ACTIONS)}
+
+Replay = namedtuple('Replay', 'seed lives bullet_count digest player_name opponent_name choices')
+
+
+class Recorder:
+    """Wraps a decide(game, player, target) function and remembers every choice it makes"""
+
+    def __init__(self, game, decide=engine.ai_decide):
+        if game.seed is None:
+            raise ValueError("Only games created from a seed can be recorded")
+        if len(game.seated) != 2 or game.target is not engine.default_target:
+            raise ValueError("Only classic two-player games can be recorded")
+        if engine.RULES._replace(bullets=0, lives=0) != engine.DEFAULT_RULES._replace(bullets=0, lives=0):
+            raise ValueError("Only games played with the default chances and cooldowns can be recorded")
+        self.game = game
+        self.lives = game.player1.lives
+        self.decide = decide
+        self.choices = []
+
+    def __call__(self, game, player, target):
+        choice = self.decide(game, player, target)
+        self.choices.append(choice)
+        return choice
+
+    def replay(self):
+        game = self.game
+        return Replay(game.seed, self.lives, game.bullet_count, engine.weights_digest()[:8],
+                      game.player1.name, game.player2.name, ''.join(self.choices))
+
+
+def pack_choices(choices):
+    packed = bytearray((len(choices) + 3) // 4)
+    for i, choice in enumerate(choices):
+        packed[i >> 2] |= CODES[choice] << ((i & 3) * 2)
+    return bytes(packed)
+
+
+def unpack_choices(data, count):
+    return ''.join(ACTIONS[(data[i >> 2] >> ((i & 3) * 2)) & 3] for i in range(count))
+
+
+def pack_name(name):
+    data = name.encode()[:255]
+    return bytes([len(data)]) + data
+
+
+def encode(replay):
+    """Serialize one replay record"""
+    if len(replay.choices) > 0xFFFF:
+        raise ValueError("Game too long to record")
+    return b''.join((
+        HEADER.pack(MAGIC, VERSION, replay.seed, replay.lives, replay.bullet_count, replay.digest,
+                    len(replay.choices)),
+        pack_name(replay.player_name),
+        pack_name(replay.opponent_name),
+        pack_choices(replay.choices),
+    ))
+
+
+def decode(data, offset=0):
+    """Read one replay record starting at `offset`; returns (replay, offset of the next record)"""
+    magic, version, seed, lives, bullet_count, digest, turns = HEADER.unpack_from(data, offset)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"No version {VERSION} replay record at byte {offset}")
+    offset += HEADER.size
+    names = []
+    for _ in range(2):
+        length = data[offset]
+        names.append(bytes(data[offset + 1:offset + 1 + length]).decode(errors='replace'))
+        offset += 1 + length
+    size = (turns + 3) // 4
+    choices = unpack_choices(data[offset:offset + size], turns)
+    return Replay(seed, lives, bullet_count, digest, names[0], names[1], choices), offset + size
+
+
+def write_replays(path, replays):
+    """Append replay records to a log file"""
+    with open(path, 'ab') as f:
+        for replay in replays:
+            f.write(encode(replay))
+
+
+def read_replays(path):
+    """Yield every replay record in a log file"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    offset = 0
+    while offset < len(data):
+        replay, offset = decode(data, offset)
+        yield replay
+
+
+def new_game(replay, emit=None):
+    """Fresh game set up exactly like the recorded one"""
+    if replay.digest != engine.weights_digest()[:8]:
+        raise ValueError("Replay was recorded with different event/hazard weights; load them with --weights")
+    return GameState(replay.player_name, replay.opponent_name, replay.lives, replay.bullet_count,
+                     emit=emit, seed=replay.seed)
+
+
+class Playback:
+    """decide() function that plays back recorded choices, optionally running `before` first"""
+
+    def __init__(self, choices, before=None):
+        self.choices = choices
+        self.before = before
+        self.position = 0
+
+    def __call__(self, game, player, target):
+        if self.before:
+            self.before(game, player, target)
+        if self.position >= len(self.choices):
+            raise ValueError("Replay ran out of choices before the game ended")
+        choice = self.choices[self.position]
+        self.position += 1
+        return choice
+
+    def remaining(self):
+        return len(self.choices) - self.position
+
+
+def run(replay, emit=None, before=None):
+    """Re-play a recorded game through the rules and return the finished game"""
+    game = new_game(replay, emit)
+    playback = Playback(replay.choices, before)
+    engine.play(game, playback)
+    if playback.remaining():
+        raise ValueError("Game ended before the replay's last choice")
+    return game
+
+
+def watch(replay, from_round=1):
+    """Re-play a recorded game at human speed through the terminal animations
+
+    Rounds before `from_round` are played headless and skipped.
+    """
+    from roulette import CLOCK, KEYS, SCREEN, TerminalView, clear_console
+
+    view = TerminalView()
+
+    def before(game, player, target):
+        if game.emit is None:
+            if game.turn_count < from_round:
+                return  # Still seeking
+            game.emit = view
+            view.cues = []
+            view.status()
+            view.perform(view.cues)
+        view.perform(view.menu(player))
+        CLOCK.sleep(1)
+
+    with KEYS, SCREEN.attached(CLOCK):
+        print(f"Replaying {replay.player_name} vs {replay.opponent_name} (seed {replay.seed})")
+        CLOCK.sleep(2)
+        clear_console()
+        game = new_game(replay, emit=view if from_round <= 1 else None)
+        view.game = game
+        view.human = game.player1
+        engine.play(game, Playback(replay.choices, before))
+        if game.emit is None:
+            print(f"The game ended in round {game.turn_count}, before round {from_round}.")
+    return game
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-run recorded roulette games")
+    parser.add_argument("log", help="replay log file")
+    parser.add_argument("--watch", type=int, metavar="N", help="watch game N with animations instead")
+    parser.add_argument("--from-round", type=int, default=1, help="when watching, skip straight to this round")
+    parser.add_argument("--speed", type=float, default=None, help="fast-forward the animations when watching")
+    parser.add_argument("--weights", help="JSON file with the event and hazard weights the games used")
+    args = parser.parse_args()
+    if args.weights:
+        engine.reload_weights(args.weights)
+
+    if args.watch is not None:
+        from roulette import CLOCK
+        if args.speed:
+            CLOCK.set_mode('fast', args.speed)
+        for number, replay in enumerate(read_replays(args.log)):
+            if number == args.watch:
+                watch(replay, args.from_round)
+                return
+        parser.error(f"{args.log} has no game {args.watch}")
+
+    totals = Counter()
+    start = time.perf_counter()
+    for replay in read_replays(args.log):
+        game = run(replay)
+        totals['games'] += 1
+        totals['turns'] += len(replay.choices)
+        if not game.winners:
+            totals['wipeout'] += 1
+        elif game.winners[0] is game.player1:
+            totals['player1'] += 1
+        elif game.winners[0] is game.player2:
+            totals['player2'] += 1
+        else:
+            totals['snoop'] += 1
+    elapsed = time.perf_counter() - start
+    games = totals['games'] or 1
+    print(f"Games replayed: {totals['games']} in {elapsed:.2f}s ({totals['games'] / elapsed:,.0f} games/s)")
+    print(f"Choices:        {totals['turns'] / games:.2f} per game")
+    for key, label in (('player1', "Player 1 wins"), ('player2', "Player 2 wins"),
+                       ('snoop', "Snoop Dogg wins"), ('wipeout', "Wipeouts")):
+        print(f"{label + ':':<16}{totals[key] / games:7.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,28 @@
+import argparse
+import math
+import queue
 import random
-import time
-import os
 import sys
+import threading
+
+import engine
+import textfx
+from clock import Clock
+from render import Renderer
+from keyboard import InputSession
+from engine import GameState, ai_decision_maker
+
+KEYS = InputSession()  # Keyboard stays in character mode for the whole session
+
+def getch():
+    return KEYS.getch()
 
-# Platform-independent getch implementation
-try:
-    import msvcrt  # Windows
-    def getch():
-        return msvcrt.getch().decode('utf-8')
-except ImportError:
-    import termios  # Unix
-    import tty
-    def getch():
-        fd = sys.stdin.fileno()
-        old_settings = termios.tcgetattr(fd)
-        try:
-            tty.setraw(sys.stdin.fileno())
-            ch = sys.stdin.read(1)
-        finally:
-            termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
-        return ch
-
-# Global game state
-player1 = None
-player2 = None
-snoop = None
-Snoopjoin = False
 GAME_DELAY = 1.5
+CLOCK = Clock()  # Every pause in the game goes through this clock
+SCREEN = Renderer()  # Off-screen frame that game output is drawn into
 
 def clear_console():
-    os.system('cls' if os.name == 'nt' else 'clear')
+    SCREEN.clear()
 
 def print_separator():
     print("=" * 50)
@@ -42,36 +35,17 @@ def print_header(title):
 def print_centered(text):
     print(f"{text:^50}")
 
-class Roulette:
-    def __init__(self):
-        self.range = list(range(50))
-        self.result = random.choice(self.range)
-        
-    def spin(self, bullet_count=6):
-        bullets = []
-        for i in range(bullet_count):
-            self.result = random.choice(self.range)
-            if self.result % 2 == 0:
-                bullets.append(0)  # Even - safe
-            else:
-                bullets.append(1)  # Odd - bang
-        return bullets
-
-class Start:
-    def roll(self, bullet_count=6):
-        r = Roulette()
-        outcome = r.spin(bullet_count)
-        return outcome
-
 class Animations:
     @staticmethod
     def spinning_animation(text, duration=2):
         frames = ["\\", "|", "/", "-", "\\", "|", "/", "-"]
-        end_time = time.time() + duration
-        while time.time() < end_time:
+        end_time = CLOCK.time() + duration
+        while CLOCK.time() < end_time and not KEYS.pending():
             for frame in frames:
                 print(f"{text} {frame}", end="\r", flush=True)
-                time.sleep(0.1)
+                CLOCK.sleep(0.1)
+                if KEYS.pending():  # Any keypress skips the animation
+                    break
         print(" " * 60, end="\r")
     
     @staticmethod
@@ -82,440 +56,136 @@ class Animations:
             progress = i / steps
             bar = "|" * int(width * progress) + "\\" * (width - int(width * progress))
             print(f"{text} [{bar}] {int(progress*100)}%", end="\r", flush=True)
-            time.sleep(duration / steps)
+            if KEYS.pending():  # Any keypress skips the animation
+                break
+            CLOCK.sleep(duration / steps)
         print(" " * 60, end="\r")
     
     @staticmethod
     def typewriter(text, delay=0.03):
-        for char in text:
-            print(char, end='', flush=True)
-            time.sleep(delay)
-        print()
+        effect = textfx.typewriter(text, delay, textfx.frame_pause(CLOCK))
+        textfx.play(effect, text, CLOCK, KEYS.pending)  # Any keypress skips the animation
+
+FIRST_NAMES = (
+    "Wobble", "Fluffy", "Noodle", "Pickle", "Bumble", "Fizzy", "Gizmo", "Wiggles",
+    "Squishy", "Boop", "Zany", "Doodle", "Fuzzy", "Bloop", "Glitch", "Snickerdoodle",
+    "Wonky", "Zigzag", "Bouncy", "Gloop", "Sprocket", "Twinkle", "Bonk", "Flump",
+    "Squiggle", "Blorp", "Fidget", "Gobble", "Wacky", "Zoink", "Bingbong", "Flapjack",
+    "Snorkel", "Booger", "Dingus", "Floop", "Gubbins", "Kerfuffle", "Mumbo", "Nerts",
+    "Piddles", "Quibble", "Razzle", "Sassafras", "Thingamajig", "Whatchamacallit", "Yikes", "Zucchini"
+)
+LAST_NAMES = (
+    "McSnort", "Butterpants", "Von Gigglesnort", "Fancybottom", "McGoo", "Pickleberry",
+    "Wobblebottom", "Snickerdoodle", "Fluffernutter", "Bumblepants", "Gigglesworth",
+    "Doodlebug", "Fizzlebottom", "Boopadoop", "Zanypants", "Wigglesworth", "Squishmallow",
+    "Blooperton", "Glitchypants", "Bonkerson", "Flumpadoodle", "Squigglebottom",
+    "Blorpington", "Fidgetspinner", "Gobbledygook", "Wackadoo", "Zoinksalot", "Bingbongle",
+    "Flapdoodle", "Snorkelberry", "Boogermeyer", "Dingusburg", "Flooperdooper", "Gubbinsmith",
+    "Kerfuffleton", "Mumbotron", "Nertsworthy", "Piddleston", "Quibblequist", "Razzledazzle",
+    "Sassypants", "Thingamabob", "Whatchamaccallit", "Yikeroni", "Zucchinibottom", "McGoofball"
+)
+OPPONENT_FIRST_NAMES = ("Bobbert", "Lulabelle", "Chuckles", "Fanny", "Doodle", "Waldo",
+                        "Binky", "Squeaky", "Muffet", "Gus", "Snuggles", "Wobble", "Fizz")
+OPPONENT_LAST_NAMES = ("Nedward", "Pippy", "Snuffy", "Trixie", "Jasperino", "Frodo",
+                       "Ziggy", "Bubbles", "Clumsy", "Wiggles", "Doodle", "Fumble", "Giggle")
+
+class NameAllocator:
+    """Hands out first/last name combinations in shuffled order, each one once
+
+    Combination k is first[k % F] + last[k // F]. Allocation walks k through
+    the permutation (stride * i + offset) mod size, with a random stride
+    coprime to the size, so only a counter is stored, not the names. Once
+    every combination has been used, they come round again with a number on
+    the end: "Gus Frodo 2".
+    """
+
+    def __init__(self, first, last, rng=random):
+        self.first = first
+        self.last = last
+        self.size = len(first) * len(last)
+        self.stride = 1
+        if self.size > 2:
+            self.stride = rng.randrange(1, self.size)
+            while math.gcd(self.stride, self.size) != 1:
+                self.stride = rng.randrange(1, self.size)
+        self.offset = rng.randrange(self.size)
+        self.count = 0
+
+    def name(self, index):
+        """Combination `index` of the table"""
+        first_count = len(self.first)
+        return self.first[index % first_count] + " " + self.last[index // first_count]
+
+    def allocate(self):
+        lap, i = divmod(self.count, self.size)
+        self.count += 1
+        name = self.name((self.stride * i + self.offset) % self.size)
+        return f"{name} {lap + 1}" if lap else name
 
 class NameGenerator:
-    def __init__(self):
-        self.first_names = [
-            "Wobble", "Fluffy", "Noodle", "Pickle", "Bumble", "Fizzy", "Gizmo", "Wiggles",
-            "Squishy", "Boop", "Zany", "Doodle", "Fuzzy", "Bloop", "Glitch", "Snickerdoodle",
-            "Wonky", "Zigzag", "Bouncy", "Gloop", "Sprocket", "Twinkle", "Bonk", "Flump",
-            "Squiggle", "Blorp", "Fidget", "Gobble", "Wacky", "Zoink", "Bingbong", "Flapjack",
-            "Snorkel", "Booger", "Dingus", "Floop", "Gubbins", "Kerfuffle", "Mumbo", "Nerts",
-            "Piddles", "Quibble", "Razzle", "Sassafras", "Thingamajig", "Whatchamacallit", "Yikes", "Zucchini"
-        ]
-        self.last_names = [
-            "McSnort", "Butterpants", "Von Gigglesnort", "Fancybottom", "McGoo", "Pickleberry",
-            "Wobblebottom", "Snickerdoodle", "Fluffernutter", "Bumblepants", "Gigglesworth",
-            "Doodlebug", "Fizzlebottom", "Boopadoop", "Zanypants", "Wigglesworth", "Squishmallow",
-            "Blooperton", "Glitchypants", "Bonkerson", "Flumpadoodle", "Squigglebottom",
-            "Blorpington", "Fidgetspinner", "Gobbledygook", "Wackadoo", "Zoinksalot", "Bingbongle",
-            "Flapdoodle", "Snorkelberry", "Boogermeyer", "Dingusburg", "Flooperdooper", "Gubbinsmith",
-            "Kerfuffleton", "Mumbotron", "Nertsworthy", "Piddleston", "Quibblequist", "Razzledazzle",
-            "Sassypants", "Thingamabob", "Whatchamaccallit", "Yikeroni", "Zucchinibottom", "McGoofball"
-        ]
-    
+    """Unique player and opponent names for as long as this generator is used"""
+
+    def __init__(self, rng=random):
+        self.players = NameAllocator(FIRST_NAMES, LAST_NAMES, rng)
+        self.opponents = NameAllocator(OPPONENT_FIRST_NAMES, OPPONENT_LAST_NAMES, rng)
+
     def generate_player_name(self):
-        return random.choice(self.first_names) + " " + random.choice(self.last_names) + " (You)"
-    
+        return self.players.allocate() + " (You)"
+
     def generate_opponent_name(self):
-        name1 = ["Bobbert", "Lulabelle", "Chuckles", "Fanny", "Doodle", "Waldo", 
-                "Binky", "Squeaky", "Muffet", "Gus", "Snuggles", "Wobble", "Fizz"]
-        name2 = ["Nedward", "Pippy", "Snuffy", "Trixie", "Jasperino", "Frodo", 
-                "Ziggy", "Bubbles", "Clumsy", "Wiggles", "Doodle", "Fumble", "Giggle"]
-        return random.choice(name1) + " " + random.choice(name2)
-
-class Player:
-    def __init__(self, name, lives=3):
-        self.name = name
-        self.lives = lives
-        self.shield = False
-        self.shield_turns = 0
-        self.drunk_turns = 0
-        self.confused = False
-        self.misses_next_turn = False
-    
-    def add_shield(self, turns=1):
-        self.shield = True
-        self.shield_turns = turns
-    
-    def make_drunk(self, turns=2):
-        self.drunk_turns = turns
-        self.confused = True
-    
-    def miss_next_turn(self):
-        self.misses_next_turn = True
-    
-    def update_status(self):
-        if self.drunk_turns > 0:
-            self.drunk_turns -= 1
-            if self.drunk_turns == 0:
-                self.confused = False
-        
-        # Reset missed turn flag after processing
-        self.misses_next_turn = False
-    
-    def use_shield(self):
-        if self.shield and self.shield_turns > 0:
-            self.shield_turns -= 1
-            if self.shield_turns == 0:
-                self.shield = False
-            return True
-        return False
-    
-    def take_damage(self, amount=1):
-        if self.use_shield():
-            print(f"{self.name}'s shield blocked the damage!")
-            return 0
-        self.lives -= amount
-        return amount
-    
-    def is_alive(self):
-        return self.lives > 0
-    
-    def get_status(self):
-        status_parts = [f"{self.name}: {self.lives}"]
-        if self.shield:
-            status_parts.append(f"Shield({self.shield_turns})")
-        if self.confused:
-            status_parts.append("Drunk")
-        if self.misses_next_turn:
-            status_parts.append("Misses")
-        return " ".join(status_parts)
-
-def display_stats(player1, player2, snoop=None):
-    print_header("CURRENT STATUS")
-    
+        return self.opponents.allocate()
+
+def stats_panel(player1, player2, *others):
+    """Status of both players, plus any other players still in the game"""
+    separator = "=" * 50
+    panel = [separator, f"|{'CURRENT STATUS':^48}|", separator]
+
     status_lines = [
         f"{player1.get_status()}",
         f"{player2.get_status()}"
     ]
-    
-    if snoop and snoop.is_alive():
-        status_lines.append(f"{snoop.get_status()}")
-    
+
+    for other in others:
+        if other and other.is_alive():
+            status_lines.append(f"{other.get_status()}")
+
     for line in status_lines:
-        print(f"| {line:<46} |")
-    
-    print_separator()
-    print()
+        panel.append(f"| {line:<46} |")
 
-def display_bullets_chamber(bullets, current_index):
-    print("   Chamber: ", end="")
+    panel.append(separator)
+    return panel
+
+def chamber_row(bullets, current_index):
+    cells = []
     for i in range(len(bullets)):
         if i == current_index:
-            print("|C|", end=" ")  # Current bullet
+            cells.append("|C|")  # Current bullet
         elif i < current_index:
-            print("|U|", end=" ")  # Used bullet
+            cells.append("|U|")  # Used bullet
         else:
-            print("|?|", end=" ")  # Remaining bullet
-    print(f"({len(bullets) - current_index} left)\n")
+            cells.append("|?|")  # Remaining bullet
+    return f"   Chamber: {' '.join(cells)} ({len(bullets) - current_index} left)"
+
+def display_stats(player1, player2, *others):
+    SCREEN.panel = stats_panel(player1, player2, *others)
+
+def display_bullets_chamber(bullets, current_index):
+    SCREEN.chamber = chamber_row(bullets, current_index)
 
 def drunk_text_effect(text):
     """Display text with drunk effect"""
-    drunk_text = ""
-    for char in text:
-        if random.random() < 0.3:  # 30% chance to mess up each character
-            if char.isalpha():
-                drunk_text += random.choice('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ')
-            else:
-                drunk_text += char
-        else:
-            drunk_text += char
-    return drunk_text
+    return textfx.drunk_text(text)
 
 def drunk_display(text, delay=0.05):
     """Display text with drunk typing effect"""
-    for char in text:
-        if random.random() < 0.1:  # 10% chance of typo
-            wrong_char = random.choice('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ!@#$%^&*()')
-            print(wrong_char, end='', flush=True)
-            time.sleep(0.1)
-            print('\b', end='', flush=True)  # Backspace
-            print(char, end='', flush=True)
-        else:
-            print(char, end='', flush=True)
-        time.sleep(delay)
-    print()
-
-def environmental_hazard():
-    """Random environmental hazard affecting all players"""
-    global player1, player2, snoop
-    
-    hazards = [
-        {
-            "name": "Lightning Storm",
-            "message": "A sudden lightning storm strikes the area!",
-            "effect": lambda: lightning_storm_effect()
-        },
-        {
-            "name": "Gas Leak",
-            "message": "A mysterious gas leak causes everyone to feel dizzy!",
-            "effect": lambda: gas_leak_effect()
-        },
-        {
-            "name": "Power Outage",
-            "message": "The power goes out! Everything is dark and confusing!",
-            "effect": lambda: power_outage_effect()
-        },
-        {
-            "name": "Earthquake",
-            "message": "The ground shakes violently!",
-            "effect": lambda: earthquake_effect()
-        },
-        {
-            "name": "Toxic Rain",
-            "message": "Acidic rain starts falling from the sky!",
-            "effect": lambda: toxic_rain_effect()
-        }
-    ]
-    
-    hazard = random.choice(hazards)
-    print_header("ENVIRONMENTAL HAZARD")
-    Animations.typewriter(hazard["message"])
-    time.sleep(GAME_DELAY)
-    hazard["effect"]()
-    return hazard["name"]
-
-def lightning_storm_effect():
-    """Lightning randomly strikes players"""
-    global player1, player2, snoop
-    
-    targets = [player for player in [player1, player2, snoop] if player and player.is_alive()]
-    if targets:
-        target = random.choice(targets)
-        Animations.typewriter(f"Lightning strikes {target.name}!")
-        target.take_damage(1)
-        time.sleep(GAME_DELAY)
-
-def gas_leak_effect():
-    """Gas leak makes players drunk"""
-    global player1, player2, snoop
-    
-    targets = [player for player in [player1, player2, snoop] if player and player.is_alive()]
-    for target in targets:
-        if random.random() < 0.7:  # 70% chance to affect each player
-            target.make_drunk(random.randint(1, 3))
-            Animations.typewriter(f"{target.name} starts seeing double!")
-            time.sleep(0.5)
-
-def power_outage_effect():
-    """Power outage causes confusion and missed turns"""
-    global player1, player2, snoop
-    
-    print("The screen flickers...")
-    time.sleep(1)
-    clear_console()
-    print("SYSTEM REBOOTING...")
-    time.sleep(2)
-    clear_console()
-    
-    # Random player might miss a turn
-    targets = [player for player in [player1, player2, snoop] if player and player.is_alive()]
-    if targets and random.random() < 0.4:
-        target = random.choice(targets)
-        target.miss_next_turn()
-        Animations.typewriter(f"{target.name} is disoriented and will miss next turn!")
-
-def earthquake_effect():
-    """Earthquake causes random damage to all"""
-    global player1, player2, snoop
-    
-    Animations.typewriter("The ground splits beneath your feet!")
-    for player in [player1, player2, snoop]:
-        if player and player.is_alive():
-            if random.random() < 0.6:  # 60% chance to take damage
-                player.take_damage(1)
-                Animations.typewriter(f"{player.name} falls and takes damage!")
-                time.sleep(0.5)
-
-def toxic_rain_effect():
-    """Toxic rain damages everyone over time"""
-    global player1, player2, snoop
-    
-    Animations.typewriter("The acidic rain burns everything it touches!")
-    for player in [player1, player2, snoop]:
-        if player and player.is_alive():
-            player.take_damage(1)
-            Animations.typewriter(f"{player.name} takes damage from the toxic rain!")
-            time.sleep(0.5)
-
-def spin_event():
-    global player1, player2, snoop, Snoopjoin
-    
-    Animations.spinning_animation("Spinning the event wheel")
-    
-    event_result = random.randint(0, 6)
-    events = {
-        0: mysterious_man_event,
-        1: nothing_event,
-        2: potion_event,
-        3: earthquake_event,
-        4: animal_event,
-        5: shield_event,
-        6: snoop_dogg_event
-    }
-    
-    events[event_result]()
-
-def mysterious_man_event():
-    global player1, player2, snoop, Snoopjoin
-    
-    Animations.typewriter("A mysterious man appeared...")
-    time.sleep(GAME_DELAY)
-    Animations.typewriter("He reaches into his pockets...")
-    time.sleep(GAME_DELAY)
-    Animations.typewriter("He has two pistols!")
-    time.sleep(GAME_DELAY)
-    
-    if Snoopjoin and snoop and snoop.is_alive():
-        target = random.choice([player1, player2, snoop])
-    else:
-        target = random.choice([player1, player2])
-    
-    Animations.typewriter(f"He aims at {target.name}!")
-    time.sleep(GAME_DELAY)
-    print("BANG! BANG!")
-    time.sleep(GAME_DELAY)
-    damage = target.take_damage(2)
-    if damage > 0:
-        Animations.typewriter(f"{target.name} loses 2 lives!")
-    time.sleep(GAME_DELAY)
-
-def nothing_event():
-    Animations.typewriter("The roulette spins wildly...")
-    time.sleep(GAME_DELAY)
-    print("But nothing happens! Phew...")
-    time.sleep(GAME_DELAY)
-
-def potion_event():
-    global player1, player2
-    
-    Animations.typewriter("A wild potion appeared!")
-    time.sleep(GAME_DELAY)
-    
-    potion_type = random.randint(1, 3)
-    if potion_type == 1:
-        player1.lives += 1
-        print(f"{player1.name} gained an extra life!")
-        time.sleep(GAME_DELAY)
-    elif potion_type == 2:
-        player2.lives += 1
-        print("The potion flew across the room due to butter fingers!")
-        print(f"{player2.name} gained an extra life!")
-        time.sleep(GAME_DELAY)
-    else:
-        print("The potion exploded harmlessly!")
-        time.sleep(GAME_DELAY)
-
-def earthquake_event():
-    global player1, player2
-    
-    Animations.typewriter("A sudden earthquake shakes the ground!")
-    time.sleep(GAME_DELAY)
-    print("Both players lose a life trying to stay balanced!")
-    time.sleep(GAME_DELAY)
-    player1.take_damage(1)
-    player2.take_damage(1)
-
-def animal_event():
-    global player1, player2
-    
-    animals = ["snake", "wolf", "bear", "lion", "alligator"]
-    animal = random.choice(animals)
-    Animations.typewriter(f"{animal} dashes through the area!")
-    time.sleep(GAME_DELAY)
-    
-    target = random.choice([player1, player2])
-    print(f"It bit {target.name}!")
-    time.sleep(GAME_DELAY)
-    target.take_damage(1)
-
-def shield_event():
-    global player1, player2
-    
-    Animations.typewriter("You found a magical shield!")
-    Animations.progress_bar("Charging shield")
-    
-    shield_target = random.choice([player1, player2])
-    turns = random.randint(1, 2)
-    shield_target.add_shield(turns)
-    print(f"{shield_target.name} gained a shield for {turns} turn(s)!")
-    time.sleep(GAME_DELAY)
-
-def snoop_dogg_event():
-    global Snoopjoin, snoop, player1, player2
-    
-    if not Snoopjoin:
-    
-        Animations.typewriter("A wild Snoop Dogg appeared!")
-        time.sleep(GAME_DELAY)
-        print("He loves playing Russian Roulette!")
-        time.sleep(GAME_DELAY)
-        
-        event_type = random.randint(1, 4)
-        if event_type == 1:
-            print("He takes a shot into the air and leaves!")
-            time.sleep(GAME_DELAY)
-            target = random.choice([player1, player2])
-            print(f"The bullet fell back and hit {target.name}!")
-            time.sleep(GAME_DELAY)
-            target.take_damage(1)
-        elif event_type == 2:
-            print("He shoots both of you and leaves!")
-            time.sleep(GAME_DELAY)
-            player1.take_damage(1)
-            player2.take_damage(1)
-        elif event_type == 3:
-            print("He challenges both of you to a quick duel!")
-            time.sleep(1)
-            winner = random.choice([player1, player2])
-            print(f"{winner.name} was faster and shot Snoop Dogg!")
-            time.sleep(GAME_DELAY)
-            if snoop:
-                snoop.take_damage(1)
-        else:
-            if not Snoopjoin:  # Only join if not already in game
-                print("He decided to join the game and play along!")
-                time.sleep(GAME_DELAY)
-                Snoopjoin = True
-                if not snoop:
-                    snoop = Player("Snoop Dogg", 3)
-            # else:
-            #     print("Snoop Dogg is already here! He just watches this time.")
-            #     time.sleep(GAME_DELAY)   
-    else:
-        Animations.typewriter("A wild Hatsune Miku appeared!")
-        time.sleep(GAME_DELAY)
-        print("Po-pi-po-pi-po-po-pi-po")
-        time.sleep(GAME_DELAY)
-        print("Po-pi-po-pi-po-po-pi-po")
-        time.sleep(GAME_DELAY)
-        
-        event_type = random.randint(1, 3)
-        if event_type == 1:
-            print("She throws her onion leek into the air!")
-            time.sleep(GAME_DELAY)
-            target = random.choice([player1, player2, snoop])
-            print(f"The onion leek fell back and hit {target.name}!")
-            time.sleep(GAME_DELAY)
-            target.take_damage(1)
-        elif event_type == 2:
-            print("She hit both of you with her onion leek and leaves!")
-            time.sleep(GAME_DELAY)
-            player1.take_damage(1)
-            player2.take_damage(1)
-            snoop.take_damage(1)
-        else:
-            print("She challenges both of you to a quick duel!")
-            time.sleep(1)
-            winner = random.choice([player1, player2, snoop])
-            print(f"{winner.name} was faster and shot Hatsune Miku!")
-            time.sleep(GAME_DELAY)
-        
+    effect = textfx.drunk_typing(text, delay, textfx.frame_pause(CLOCK))
+    textfx.play(effect, text, CLOCK, KEYS.pending)  # Any keypress skips the animation
 
 def get_valid_input(prompt, valid_choices):
     """Get validated input from user"""
     while True:
         print(prompt, end="", flush=True)
+        SCREEN.present()
         try:
             choice = getch().lower()
             print(choice)  # Echo the choice
@@ -527,304 +197,582 @@ def get_valid_input(prompt, valid_choices):
             print("\nGame interrupted. Exiting...")
             sys.exit(1)
 
-def ai_decision_maker(ai_player, target_player):
-    """Make strategic decision for AI player"""
-    if ai_player.confused:
-        # Drunk AI makes random choices
-        return random.choice(['1', '2', '3'])
-    
-    # Strategic decision making
-    if ai_player.lives <= 1:
-        # Desperate - try special event for potential help
-        return '3'
-    elif target_player.lives <= 1 and random.random() < 0.7:
-        # Finish off weak opponent
-        return '2'
-    elif ai_player.lives >= 3 and random.random() < 0.4:
-        # Healthy and confident - shoot opponent
-        return '2'
-    elif random.random() < 0.3:
-        # Occasionally try special event
-        return '3'
-    else:
-        # Default to self-shot (safer)
-        return '1'
 
-def player_turn(player, target, bullets, current_index):
-    global player1, player2, snoop, Snoopjoin
-    
-    display_stats(player1, player2, snoop if Snoopjoin else None)
-    display_bullets_chamber(bullets, current_index)
-    
-    print_header(f"{player.name.upper()}'S TURN")
-    
-    if player.misses_next_turn:
-        print(f"{player.name} is disoriented and misses this turn!")
-        time.sleep(GAME_DELAY)
-        return current_index
-    
-    if player.shield:
-        print(f"{player.name} has a shield for {player.shield_turns} more turn(s)!")
-    
-    if player.confused:
-        print(f"{player.name} is drunk and confused!")
-    
-    print("Choose your action:")
-    print("1. Pull the trigger on yourself")
-    print("2. Shoot your opponent")
-    print("3. Feeling lucky")
-    print()
-    
-    if player == player1:  # Human player (now with random name)
-        choice = get_valid_input("Enter your choice (1-3): ", ['1', '2', '3'])
-    else:
-        # AI player
-        time.sleep(1)
-        choice = ai_decision_maker(player, target)
-        print(f"{player.name} chooses option {choice}")
-    
-    print()
-    
-    # Apply drunk effect to choice
-    if player.confused and random.random() < 0.4:  # 40% chance to mess up choice
-        original_choice = choice
-        choices = ['1', '2', '3']
-        if original_choice in choices:
-            choices.remove(original_choice)
-        choice = random.choice(choices)
-        drunk_display(f"{player.name} meant to choose {original_choice} but chose {choice} instead!", 0.05)
-    
-    if choice == '1':
-        Animations.spinning_animation("Pulling the trigger")
-        time.sleep(GAME_DELAY)
-        return handle_trigger_pull(player, None, bullets, current_index)
-    
-    elif choice == '2':
-        print(f"{player.name} aims at {target.name}!")
-        Animations.spinning_animation("Taking aim")
-        time.sleep(GAME_DELAY)
-        return handle_trigger_pull(player, target, bullets, current_index)
-    
-    else:  # choice == '3'
-        print(f"{player.name} tries their luck!")
-        spin_event()
-        # Special event costs the player's turn but doesn't use a bullet
-        return current_index
-
-def handle_trigger_pull(shooter, target, bullets, current_index):
-    if current_index >= len(bullets):
-        print("No more bullets in the chamber! Reloading...")
-        return 0  # Reset to start new chamber
-    
-    # Check for misfire
-    misfire = random.randint(1, 10) == 1  # 10% chance
-    
-    if misfire:
-        print("MISFIRE! The gun jams!")
-        time.sleep(GAME_DELAY)
-        return current_index  # Bullet not consumed
-    
-    if bullets[current_index] == 1:  # Bang!
-        if target:
-            # Shooting at opponent
-            damage = target.take_damage(1)
-            if damage > 0:
-                print(f"BANG! {target.name} loses a life!")
-                print(f"{target.name} now has {target.lives} lives")
-                time.sleep(GAME_DELAY)
-            else:
-                print(f"{target.name}'s shield protected them!")
-                time.sleep(GAME_DELAY)
+ANIMALS = ["snake", "wolf", "bear", "lion", "alligator"]
+
+GUEST_NAMES = {'snoop': "Snoop Dogg", 'miku': "Hatsune Miku"}
+
+GUEST_ACTIONS = {
+    ('snoop', 'fallout'): "He takes a shot into the air and leaves!",
+    ('snoop', 'shoots'): "He shoots both of you and leaves!",
+    ('snoop', 'duel'): "He challenges both of you to a quick duel!",
+    ('miku', 'fallout'): "She throws her onion leek into the air!",
+    ('miku', 'shoots'): "She hit both of you with her onion leek and leaves!",
+    ('miku', 'duel'): "She challenges both of you to a quick duel!",
+}
+
+VICTORY_MESSAGES = [
+    "You survived against all odds!",
+    "Lady Luck was on your side!",
+    "You're the last one standing!",
+    "Victory tastes sweet!",
+]
+
+DEFEAT_MESSAGES = [
+    "Better luck next time!",
+    "The odds were not in your favor!",
+    "That was a close one!",
+]
+
+HAZARD_MESSAGES = {
+    "Lightning Storm": "A sudden lightning storm strikes the area!",
+    "Gas Leak": "A mysterious gas leak causes everyone to feel dizzy!",
+    "Power Outage": "The power goes out! Everything is dark and confusing!",
+    "Earthquake": "The ground shakes violently!",
+    "Toxic Rain": "Acidic rain starts falling from the sky!",
+}
+
+class Narrator:
+    """Turns engine events into cues: the text, animations and pauses that present them.
+
+    A cue is a tuple whose first item is its kind: ('say', text),
+    ('type', text), ('drunk', text), ('spin', text), ('progress', text,
+    duration), ('pause', seconds), ('header', title), ('clear',) or
+    ('status', panel_lines, chamber_line). Cues are scripted as soon as an
+    event is emitted, so they describe the game as it was at that moment
+    even if they are played back later.
+    """
+
+    def __init__(self, game=None, human=None):
+        self.game = game
+        self.human = human
+        self.cues = []
+        self.handlers = {
+            engine.HazardStruck: self.hazard_struck,
+            engine.HazardPassed: self.hazard_passed,
+            engine.TurnStarted: self.turn_started,
+            engine.TurnSkipped: self.turn_skipped,
+            engine.ActionChosen: self.action_chosen,
+            engine.ChoiceFumbled: self.choice_fumbled,
+            engine.TriggerPulled: self.trigger_pulled,
+            engine.Misfire: self.misfire,
+            engine.BulletFired: self.bullet_fired,
+            engine.Damaged: self.damaged,
+            engine.ShieldAbsorbed: self.shield_absorbed,
+            engine.Reloaded: self.reloaded,
+            engine.EventSpun: self.event_spun,
+            engine.LifeGained: self.life_gained,
+            engine.ShieldGained: self.shield_gained,
+            engine.MadeDrunk: self.made_drunk,
+            engine.TurnLost: self.turn_lost,
+            engine.GuestAction: self.guest_action,
+            engine.GuestJoined: self.guest_joined,
+            engine.DuelWon: self.duel_won,
+            engine.Fizzled: self.fizzled,
+            engine.TurnEnded: self.turn_ended,
+            engine.GameOver: self.game_over,
+        }
+
+    def script(self, event):
+        """Cues presenting one engine event"""
+        self.cues = []
+        handler = self.handlers.get(type(event))
+        if handler:
+            handler(event)
+        return self.cues
+
+    def is_human(self, player):
+        return player is (self.human or self.game.player1)
+
+    # Cue helpers
+
+    def say(self, text=""):
+        self.cues.append(('say', text))
+
+    def typewrite(self, text):
+        self.cues.append(('type', text))
+
+    def drunk(self, text):
+        self.cues.append(('drunk', text))
+
+    def spin(self, text):
+        self.cues.append(('spin', text))
+
+    def progress(self, text, duration=2):
+        self.cues.append(('progress', text, duration))
+
+    def pause(self, seconds=GAME_DELAY):
+        self.cues.append(('pause', seconds))
+
+    def header(self, title):
+        self.cues.append(('header', title))
+
+    def clear(self):
+        self.cues.append(('clear',))
+
+    def status(self):
+        game = self.game
+        self.cues.append(('status',
+                          stats_panel(*game.players),
+                          chamber_row(game.bullets, game.current_bullet)))
+
+    def menu(self, player):
+        """Cues offering the actions to `player`"""
+        self.cues = []
+        if player.shield:
+            self.say(f"{player.name} has a shield for {player.shield_turns} more turn(s)!")
+
+        if player.confused:
+            self.say(f"{player.name} is drunk and confused!")
+
+        self.say("Choose your action:")
+        self.say("1. Pull the trigger on yourself")
+        self.say("2. Shoot your opponent")
+        self.say("3. Feeling lucky")
+        self.say()
+        return self.cues
+
+    # Event handlers
+
+    def hazard_struck(self, event):
+        self.header("ENVIRONMENTAL HAZARD")
+        self.typewrite(HAZARD_MESSAGES[event.name])
+        self.pause()
+
+        if event.name == "Power Outage":
+            self.say("The screen flickers...")
+            self.pause(1)
+            self.clear()
+            self.say("SYSTEM REBOOTING...")
+            self.pause(2)
+            self.clear()
+        elif event.name == "Earthquake":
+            self.typewrite("The ground splits beneath your feet!")
+        elif event.name == "Toxic Rain":
+            self.typewrite("The acidic rain burns everything it touches!")
+
+    def hazard_passed(self, event):
+        self.pause(2)
+        self.clear()
+
+    def turn_started(self, event):
+        self.status()
+        self.header(f"{event.player.name.upper()}'S TURN")
+
+    def turn_skipped(self, event):
+        self.say(f"{event.player.name} is disoriented and misses this turn!")
+        self.pause()
+
+    def action_chosen(self, event):
+        if not self.is_human(event.player):
+            self.say(f"{event.player.name} chooses option {event.choice}")
+        self.say()
+
+    def choice_fumbled(self, event):
+        self.drunk(f"{event.player.name} meant to choose {event.intended} but chose {event.choice} instead!")
+
+    def trigger_pulled(self, event):
+        if event.target:
+            self.say(f"{event.shooter.name} aims at {event.target.name}!")
+            self.spin("Taking aim")
         else:
-            # Shooting self
-            damage = shooter.take_damage(1)
-            if damage > 0:
-                print(f"BANG! {shooter.name} loses a life!")
-                print(f"{shooter.name} now has {shooter.lives} lives")
-                time.sleep(GAME_DELAY)
+            self.spin("Pulling the trigger")
+        self.pause()
+
+    def misfire(self, event):
+        self.say("MISFIRE! The gun jams!")
+        self.pause()
+
+    def bullet_fired(self, event):
+        if not event.bang:  # Click!
+            self.say("CLICK! Safe this turn.")
+            self.say(f"{(event.target or event.shooter).name} breathes a sigh of relief!")
+            self.pause()
+
+    def before_hit(self, player, cause):
+        """Narration leading up to a hit, shown whether or not a shield holds"""
+        if cause == 'lightning':
+            self.typewrite(f"Lightning strikes {player.name}!")
+        elif cause == 'mysterious_man':
+            self.typewrite(f"He aims at {player.name}!")
+            self.pause()
+            self.say("BANG! BANG!")
+            self.pause()
+        elif cause == 'animal':
+            self.say(f"It bit {player.name}!")
+            self.pause()
+        elif cause == 'snoop_fallout':
+            self.say(f"The bullet fell back and hit {player.name}!")
+            self.pause()
+        elif cause == 'miku_fallout':
+            self.say(f"The onion leek fell back and hit {player.name}!")
+            self.pause()
+
+    def after_hit(self, player, cause):
+        """Narration following a hit, shown whether or not a shield holds"""
+        if cause == 'lightning':
+            self.pause()
+        elif cause == 'quake':
+            self.typewrite(f"{player.name} falls and takes damage!")
+            self.pause(0.5)
+        elif cause == 'toxic_rain':
+            self.typewrite(f"{player.name} takes damage from the toxic rain!")
+            self.pause(0.5)
+
+    def damaged(self, event):
+        player = event.player
+        self.before_hit(player, event.cause)
+        if event.cause in ('shot', 'self'):
+            self.say(f"BANG! {player.name} loses a life!")
+            self.say(f"{player.name} now has {player.lives} lives")
+            self.pause()
+        elif event.cause == 'mysterious_man':
+            self.typewrite(f"{player.name} loses 2 lives!")
+            self.pause()
+        self.after_hit(player, event.cause)
+
+    def shield_absorbed(self, event):
+        player = event.player
+        self.before_hit(player, event.cause)
+        self.say(f"{player.name}'s shield blocked the damage!")
+        if event.cause == 'shot':
+            self.say(f"{player.name}'s shield protected them!")
+            self.pause()
+        elif event.cause == 'self':
+            self.say(f"{player.name}'s shield protected you!")
+            self.pause()
+        elif event.cause == 'mysterious_man':
+            self.pause()
+        self.after_hit(player, event.cause)
+
+    def reloaded(self, event):
+        self.say("\n*** Chamber empty! Reloading... ***")
+        self.pause()
+
+    def event_spun(self, event):
+        if event.player:
+            self.say(f"{event.player.name} tries their luck!")
+        self.spin("Spinning the event wheel")
+
+        if event.name == "mysterious_man":
+            self.typewrite("A mysterious man appeared...")
+            self.pause()
+            self.typewrite("He reaches into his pockets...")
+            self.pause()
+            self.typewrite("He has two pistols!")
+            self.pause()
+        elif event.name == "nothing":
+            self.typewrite("The roulette spins wildly...")
+            self.pause()
+            self.say("But nothing happens! Phew...")
+            self.pause()
+        elif event.name == "potion":
+            self.typewrite("A wild potion appeared!")
+            self.pause()
+        elif event.name == "earthquake":
+            self.typewrite("A sudden earthquake shakes the ground!")
+            self.pause()
+            self.say("Both players lose a life trying to stay balanced!")
+            self.pause()
+        elif event.name == "animal":
+            self.typewrite(f"{random.choice(ANIMALS)} dashes through the area!")
+            self.pause()
+        elif event.name == "shield":
+            self.typewrite("You found a magical shield!")
+            self.progress("Charging shield")
+        elif event.name == "snoop_dogg":
+            self.typewrite("A wild Snoop Dogg appeared!")
+            self.pause()
+            self.say("He loves playing Russian Roulette!")
+            self.pause()
+        elif event.name == "hatsune_miku":
+            self.typewrite("A wild Hatsune Miku appeared!")
+            self.pause()
+            self.say("Po-pi-po-pi-po-po-pi-po")
+            self.pause()
+            self.say("Po-pi-po-pi-po-po-pi-po")
+            self.pause()
+
+    def life_gained(self, event):
+        if event.cause == 'thrown_potion':
+            self.say("The potion flew across the room due to butter fingers!")
+        self.say(f"{event.player.name} gained an extra life!")
+        self.pause()
+
+    def shield_gained(self, event):
+        self.say(f"{event.player.name} gained a shield for {event.turns} turn(s)!")
+        self.pause()
+
+    def made_drunk(self, event):
+        self.typewrite(f"{event.player.name} starts seeing double!")
+        self.pause(0.5)
+
+    def turn_lost(self, event):
+        self.typewrite(f"{event.player.name} is disoriented and will miss next turn!")
+
+    def guest_action(self, event):
+        self.say(GUEST_ACTIONS[event.guest, event.action])
+        self.pause(1 if event.action == 'duel' else GAME_DELAY)
+
+    def guest_joined(self, event):
+        self.say("He decided to join the game and play along!")
+        self.pause()
+
+    def duel_won(self, event):
+        self.say(f"{event.winner.name} was faster and shot {GUEST_NAMES[event.guest]}!")
+        self.pause()
+
+    def fizzled(self, event):
+        self.say("The potion exploded harmlessly!")
+        self.pause()
+
+    def turn_ended(self, event):
+        if event.player.is_alive():
+            self.progress("Passing turn", 1)
+            self.clear()
+
+    def game_over(self, event):
+        self.status()
+        self.clear()
+        self.header("GAME OVER")
+        self.pause()
+
+        alive_players = event.winners
+
+        if len(alive_players) == 1:
+            winner = alive_players[0]
+            self.say(f"WINNER: {winner.name}!")
+            self.say(f"Final lives: {winner.lives}")
+            if self.is_human(winner):
+                self.say(random.choice(VICTORY_MESSAGES))
             else:
-                print(f"{shooter.name}'s shield protected you!")
-                time.sleep(GAME_DELAY)
-    else:  # Click!
-        print("CLICK! Safe this turn.")
-        if target:
-            print(f"{target.name} breathes a sigh of relief!")
-            time.sleep(GAME_DELAY)
+                self.say(random.choice(DEFEAT_MESSAGES))
+        elif len(alive_players) > 1:
+            self.say("It's a tie!")
+            self.say("Alive players:")
+            for player in alive_players:
+                self.say(f"  {player.name} with {player.lives} lives")
         else:
-            print(f"{shooter.name} breathes a sigh of relief!")
-            time.sleep(GAME_DELAY)
-    
-    return current_index + 1
-
-def check_game_over():
-    global player1, player2, snoop
-    
-    alive_players = []
-    if player1.is_alive():
-        alive_players.append(player1)
-    if player2.is_alive():
-        alive_players.append(player2)
-    if snoop and snoop.is_alive():
-        alive_players.append(snoop)
-    
-    return len(alive_players) <= 1, alive_players
+            self.say("All players have been eliminated!")
+            self.say("It's a complete wipeout!")
+
+class RenderThread:
+    """Plays a view's cue lists on a background thread, in the order they were submitted"""
+
+    def __init__(self, view):
+        self.view = view
+        self.queue = queue.Queue()
+        self.error = None
+        self.cancelled = False
+        self.thread = threading.Thread(target=self.run, name="render", daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while True:
+            cues = self.queue.get()
+            try:
+                if cues is None:
+                    return
+                if self.error is None and not self.cancelled:
+                    self.view.perform(cues)
+            except BaseException as error:
+                self.error = error  # Raised again on the game thread by wait()
+            finally:
+                self.queue.task_done()
+
+    def submit(self, cues):
+        if cues:
+            self.queue.put(cues)
+
+    def wait(self):
+        """Block until everything submitted so far has been played"""
+        self.queue.join()
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def stop(self):
+        self.queue.put(None)
+        self.thread.join()
+
+    def cancel(self):
+        """Drop every cue not yet played and let the thread end without waiting for it"""
+        self.cancelled = True
+        self.queue.put(None)
+
+class TerminalView(Narrator):
+    """Plays narration cues on the local terminal
+
+    With `background`, cues are still scripted on the game thread as events
+    happen, but played by a RenderThread: the rules resolve a turn at once
+    and AI players decide while the previous turn is still animating. Only
+    a human's turn waits for the screen to catch up.
+    """
+
+    def __init__(self, game=None, human=None, ai=None, background=False):
+        super().__init__(game, human)
+        self.ai = ai  # decide(game, player, target) for AI seats; the classic AI if None
+        self.renderer = RenderThread(self) if background else None
+
+    def __call__(self, event):
+        self.show(self.script(event))
+
+    def show(self, cues):
+        """Play cues now, or queue them for the render thread"""
+        if self.renderer:
+            self.renderer.submit(cues)
+        else:
+            self.perform(cues)
+
+    def wait(self):
+        """Let the render thread catch up with the game"""
+        if self.renderer:
+            self.renderer.wait()
+
+    def close(self, abort=False):
+        """Finish playing the queued cues, or with `abort` drop them"""
+        if self.renderer:
+            if abort:
+                self.renderer.cancel()
+            else:
+                self.renderer.wait()
+                self.renderer.stop()
+            self.renderer = None
+
+    def perform(self, cues):
+        for cue in cues:
+            kind = cue[0]
+            if kind == 'say':
+                print(cue[1])
+            elif kind == 'type':
+                Animations.typewriter(cue[1])
+            elif kind == 'drunk':
+                drunk_display(cue[1], 0.05)
+            elif kind == 'spin':
+                Animations.spinning_animation(cue[1])
+            elif kind == 'progress':
+                Animations.progress_bar(cue[1], cue[2])
+            elif kind == 'pause':
+                CLOCK.sleep(cue[1])
+            elif kind == 'header':
+                print_header(cue[1])
+            elif kind == 'clear':
+                clear_console()
+            elif kind == 'status':
+                SCREEN.panel = cue[1]
+                SCREEN.chamber = cue[2]
+
+    def ready(self, player):
+        """Show the menu; before a human's turn, let the screen catch up"""
+        self.show(self.menu(player))
+        if self.is_human(player):
+            self.wait()
+
+    def choose_action(self, game, player, target):
+        self.ready(player)
+        return self.decide(game, player, target)
+
+    def decide(self, game, player, target):
+        if self.is_human(player):  # Human player (now with random name)
+            return get_valid_input("Enter your choice (1-3): ", ['1', '2', '3'])
+        # AI player
+        self.show([('pause', 1)])
+        if self.ai:
+            return self.ai(game, player, target)
+        return ai_decision_maker(player, target, game.ai_rng)
 
-def initialize_game():
+def initialize_game(ai=None, background=True):
     """Initialize the game state"""
-    global player1, player2, snoop, Snoopjoin
-    
     Animations.progress_bar("Loading game", 1)
-    time.sleep(1)
-    
+    CLOCK.sleep(1)
+
     # Generate random names for both players
     name_gen = NameGenerator()
     player_name = name_gen.generate_player_name()
     opponent_name = name_gen.generate_opponent_name()
-    
+
     print(f"\nYour name: {player_name}")
     print(f"Opponent: {opponent_name}")
-    time.sleep(2)
-    
+    CLOCK.sleep(2)
+
     # Initialize players with random names
-    player1 = Player(player_name, 3)
-    player2 = Player(opponent_name, 3)
-    snoop = None
-    Snoopjoin = False
+    view = TerminalView(ai=ai, background=background)
+    game = GameState(player_name, opponent_name, engine.RULES.lives, emit=view)
+    view.game = game
+    return game, view
+
+def main(ai=None, record=None, metrics=None, background=True):
+    with KEYS, SCREEN.attached(CLOCK):
+        play_game(ai, record, metrics, background)
+
+def play_game(ai=None, record=None, metrics=None, background=True):
+    game, view = initialize_game(ai, background)
 
-def main():
-    global player1, player2, snoop, Snoopjoin
-    
-    initialize_game()
-    
-    # Generate initial bullets
-    game = Start()
-    bullets = game.roll(6)  # 6 bullets per chamber
-    current_bullet = 0
-    
-    hazard_cooldown = 0
-    turn_count = 0
-    
-    clear_console()
-    
-    # Main game loop
-    while True:
-        turn_count += 1
-        
-        # Environmental hazard check (every 3-5 turns)
-        if hazard_cooldown <= 0 and random.random() < 0.25:  # 25% chance every turn after cooldown
-            hazard_name = environmental_hazard()
-            hazard_cooldown = random.randint(3, 5)
-            time.sleep(2)
-            clear_console()
-        else:
-            hazard_cooldown = max(0, hazard_cooldown - 1)
-        
-        # Player 1 turn (human player with random name)
-        if player1.is_alive():
-            current_bullet = player_turn(player1, player2, bullets, current_bullet)
-            player1.update_status()
-            
-            # Check if we need to reload
-            if current_bullet >= len(bullets):
-                print("\n*** Chamber empty! Reloading... ***")
-                bullets = game.roll(6)
-                current_bullet = 0
-                time.sleep(GAME_DELAY)
-            
-            game_over, winners = check_game_over()
-            if game_over:
-                break
-            
-            if player1.is_alive():
-                Animations.progress_bar("Passing turn", 1)
-                clear_console()
-        
-        # Player 2 turn
-        if player2.is_alive():
-            current_bullet = player_turn(player2, player1, bullets, current_bullet)
-            player2.update_status()
-            
-            # Check if we need to reload
-            if current_bullet >= len(bullets):
-                print("\n*** Chamber empty! Reloading... ***")
-                bullets = game.roll(6)
-                current_bullet = 0
-                time.sleep(GAME_DELAY)
-            
-            game_over, winners = check_game_over()
-            if game_over:
-                break
-            
-            if player2.is_alive():
-                Animations.progress_bar("Passing turn", 1)
-                clear_console()
-        
-        # Snoop Dogg turn
-        if Snoopjoin and snoop and snoop.is_alive():
-            # Choose a target from alive players
-            alive_players = [p for p in [player1, player2] if p.is_alive()]
-            if alive_players:
-                target = random.choice(alive_players)
-                current_bullet = player_turn(snoop, target, bullets, current_bullet)
-                snoop.update_status()
-                
-                # Check if we need to reload
-                if current_bullet >= len(bullets):
-                    print("\n*** Chamber empty! Reloading... ***")
-                    bullets = game.roll(6)
-                    current_bullet = 0
-                    time.sleep(GAME_DELAY)
-                
-                game_over, winners = check_game_over()
-                if game_over:
-                    break
-                
-                if snoop.is_alive():
-                    Animations.progress_bar("Passing turn", 1)
-                    clear_console()
-    
-    # Game over sequence
     clear_console()
-    print_header("GAME OVER")
-    time.sleep(GAME_DELAY)
-    
-    alive_players = [p for p in [player1, player2, snoop] if p and p.is_alive()]
-    
-    if len(alive_players) == 1:
-        winner = alive_players[0]
-        print(f"WINNER: {winner.name}!")
-        print(f"Final lives: {winner.lives}")
-        
-        if winner == player1:
-            victory_messages = [
-                "You survived against all odds!",
-                "Lady Luck was on your side!",
-                "You're the last one standing!",
-                "Victory tastes sweet!",
-            ]
-        else:
-            victory_messages = [
-                "Better luck next time!",
-                "The odds were not in your favor!",
-                "That was a close one!",
-            ]
-        
-        print(f"{random.choice(victory_messages)}")
-        
-    elif len(alive_players) > 1:
-        print("It's a tie!")
-        print("Alive players:")
-        for player in alive_players:
-            print(f"  {player.name} with {player.lives} lives")
+
+    # Main game loop; the game over sequence is narrated from the GameOver event
+    if metrics:
+        metrics.attach(game)
+        timed = metrics.timed('decision', view.decide)
+
+        def decide(game, player, target):
+            view.ready(player)  # Waiting for queued animations is render time, not decision time
+            return timed(game, player, target)
     else:
-        print("All players have been eliminated!")
-        print("It's a complete wipeout!")
+        decide = view.choose_action
+    if record:
+        from replay import Recorder, write_replays
+        decide = Recorder(game, decide)
+    try:
+        engine.play(game, decide)
+    except BaseException:
+        view.close(abort=True)  # Ctrl-C or a crash should not sit through the queued animations
+        raise
+    view.close()  # Let the last turns and the game over screen finish playing
+    if record:
+        write_replays(record, [decide.replay()])
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="The Not-So-Russian-Roulette")
+    parser.add_argument("--speed", type=float, default=None, help="fast-forward all pauses and animations by this factor")
+    parser.add_argument("--turbo", action="store_true", help="skip all pauses and animation delays")
+    parser.add_argument("--weights", help="JSON file with event and hazard weights")
+    parser.add_argument("--ai", choices=["classic", "mcts", "perfect"], default="classic", help="opponent AI")
+    parser.add_argument("--think-ms", type=float, default=20, help="thinking time per move for the mcts AI")
+    parser.add_argument("--policy", default="policy.bin", help="policy table for the perfect AI (see solver.py)")
+    parser.add_argument("--sync-render", action="store_true",
+                        help="play every animation before the next rule step instead of on a render thread")
+    parser.add_argument("--record", help="append a replay of the game to this log file (see replay.py)")
+    parser.add_argument("--metrics", help="write phase timings and counters here (.json, otherwise Prometheus text)")
+    parser.add_argument("--metrics-interval", type=float, default=None,
+                        help="also rewrite the metrics file every this many seconds")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
+    args = parse_args()
+    if args.weights:
+        engine.reload_weights(args.weights)
+    if args.turbo:
+        CLOCK.set_mode('turbo')
+    elif args.speed:
+        CLOCK.set_mode('fast', args.speed)
+    ai = None
+    if args.ai == "mcts":
+        from mcts import MCTSAI
+        ai = MCTSAI(budget=args.think_ms / 1000)
+    elif args.ai == "perfect":
+        from solver import PerfectAI
+        ai = PerfectAI(args.policy)
+    metrics = None
+    if args.metrics:
+        from metrics import Metrics
+        metrics = Metrics().install()
+        metrics.patch(TerminalView, 'perform', 'render')
+        metrics.export(args.metrics, args.metrics_interval)
     try:
-        main()
+        main(ai, args.record, metrics, not args.sync_render)
     except KeyboardInterrupt:
         print("\n\nGame interrupted by user. Thanks for playing!")
     except Exception as e:
         print(f"\nAn error occurred: {e}")
-        print("Please restart the game.")
\ No newline at end of file
+        print("Please restart the game.")
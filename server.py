@@ -0,0 +1,323 @@
+"""Multi-match game server on a single asyncio event loop.
+
+Every connection gets its own match against an AI opponent, or against a
+whole table of them with ``--players``. The player's
+keypresses arrive over the socket instead of through getch(), the AI moves
+inline, and every pause becomes ``await asyncio.sleep`` so a match waiting
+on its narration never holds up the others.
+
+    python server.py --port 7777          # then: nc localhost 7777
+    python server.py --unix /tmp/roulette.sock
+    python server.py --players 20 --target random   # battle royale against 19 bots
+
+With ``--watch-port`` spectators can connect to a second port, pick a live
+match and follow it. Every piece of narration is encoded once into a bytes
+frame. That same object is written to the player and queued for every
+spectator, so a popular match costs one encode per frame, not one per
+viewer. Each spectator's queue is bounded. When a slow viewer falls that
+far behind, their backlog is dropped and replaced by the latest status
+panel, and they carry on from the live frame.
+
+    python server.py --watch-port 7778    # then: nc localhost 7778
+"""
+import argparse
+import asyncio
+import itertools
+from collections import deque
+from contextlib import AsyncExitStack
+
+import engine
+from engine import GameState, ai_decision_maker
+from roulette import NameGenerator, Narrator
+
+ACTIONS = ['1', '2', '3']
+SPECTATOR_QUEUE = 32  # Frames a spectator may fall behind before the backlog is dropped
+
+
+class Spectator:
+    """One viewer's connection and its bounded queue of frames"""
+
+    def __init__(self, writer, limit=SPECTATOR_QUEUE):
+        self.writer = writer
+        self.limit = limit
+        self.frames = deque()
+        self.ready = asyncio.Event()
+        self.dropped = 0
+
+    def offer(self, frame, snapshot=None):
+        """Queue a frame; if the queue is full, skip the backlog and resume from `snapshot`"""
+        if len(self.frames) >= self.limit:
+            self.dropped += len(self.frames)
+            self.frames.clear()
+            if snapshot is not None and snapshot is not frame:
+                self.frames.append(snapshot)
+        self.frames.append(frame)
+        self.ready.set()
+
+    def end(self):
+        self.frames.append(None)
+        self.ready.set()
+
+    async def pump(self):
+        """Write queued frames until the broadcast ends"""
+        while True:
+            await self.ready.wait()
+            self.ready.clear()
+            while self.frames:
+                frame = self.frames.popleft()
+                if frame is None:
+                    return
+                self.writer.write(frame)
+                await self.writer.drain()
+
+
+class Broadcast:
+    """Frames of one match, encoded once and shared by every spectator"""
+
+    def __init__(self, limit=SPECTATOR_QUEUE):
+        self.limit = limit
+        self.spectators = set()
+        self.snapshot = None  # Latest status panel frame, where late or lagging viewers pick up
+        self.closed = False
+
+    def publish(self, frame, snapshot=False):
+        if snapshot:
+            self.snapshot = frame
+        for spectator in self.spectators:
+            spectator.offer(frame, self.snapshot)
+
+    def close(self):
+        self.closed = True
+        for spectator in self.spectators:
+            spectator.end()
+
+    async def watch(self, writer):
+        """Stream this match to `writer` until it ends or the viewer leaves"""
+        spectator = Spectator(writer, self.limit)
+        if self.snapshot is not None:
+            spectator.offer(self.snapshot)
+        if self.closed:
+            spectator.end()
+        self.spectators.add(spectator)
+        try:
+            await spectator.pump()
+        finally:
+            self.spectators.discard(spectator)
+
+
+class Match:
+    """One human connection playing one game"""
+
+    def __init__(self, reader, writer, speed=1.0, players=2, target=None, names=None, number=0,
+                 spectator_queue=SPECTATOR_QUEUE):
+        self.reader = reader
+        self.writer = writer
+        self.speed = speed
+        self.players = players
+        self.target = target
+        self.names = names or NameGenerator()
+        self.number = number
+        self.title = "starting"
+        self.broadcast = Broadcast(spectator_queue)
+        self.cues = []
+        self.narrator = Narrator()
+
+    def emit(self, event):
+        self.cues.extend(self.narrator.script(event))
+
+    def send(self, text="", end="\n"):
+        """Text for the player only"""
+        self.writer.write((text + end).encode())
+
+    def show(self, lines, snapshot=False):
+        """Lines for the player and every spectator, encoded once"""
+        frame = ("\n".join(lines) + "\n").encode()
+        self.writer.write(frame)
+        self.broadcast.publish(frame, snapshot)
+
+    async def pause(self, seconds):
+        await self.writer.drain()
+        await asyncio.sleep(seconds / self.speed)
+
+    async def perform(self, cues):
+        """Play narration cues to the client as plain text"""
+        for cue in cues:
+            kind = cue[0]
+            if kind in ('say', 'drunk'):
+                self.show([cue[1]])
+            elif kind == 'type':
+                self.show([cue[1]])
+                await self.pause(len(cue[1]) * 0.03)
+            elif kind == 'spin':
+                self.show([f"{cue[1]}..."])
+                await self.pause(2)
+            elif kind == 'progress':
+                self.show([f"{cue[1]}..."])
+                await self.pause(cue[2])
+            elif kind == 'pause':
+                await self.pause(cue[1])
+            elif kind == 'header':
+                self.show(["=" * 50, f"|{cue[1]:^48}|", "=" * 50])
+            elif kind == 'clear':
+                self.show([""])
+            elif kind == 'status':
+                self.show(cue[1] + [cue[2], ""], snapshot=True)
+        await self.writer.drain()
+
+    async def flush(self):
+        cues, self.cues = self.cues, []
+        await self.perform(cues)
+
+    async def read_choice(self):
+        """Ask the human for an action until they send a valid one"""
+        while True:
+            self.send("Enter your choice (1-3): ", end="")
+            await self.writer.drain()
+            line = await self.reader.readline()
+            if not line:
+                raise ConnectionResetError("player disconnected")
+            choice = line.decode(errors='replace').strip().lower()[:1]
+            if choice in ACTIONS:
+                return choice
+            self.send(f"Invalid input. Please enter one of: {', '.join(ACTIONS)}")
+
+    async def run(self):
+        name_gen = self.names
+        others = [name_gen.generate_opponent_name() for _ in range(self.players - 2)]
+        game = GameState(name_gen.generate_player_name(), name_gen.generate_opponent_name(), engine.RULES.lives,
+                         emit=self.emit, others=others, target=self.target)
+        self.narrator.game = game
+        self.narrator.human = game.player1
+
+        player = game.player1.name
+        if player.endswith(" (You)"):
+            player = player[:-len(" (You)")]
+        self.title = f"{player} vs {game.player2.name}"
+        if others:
+            self.title += f" and {len(others)} more"
+
+        self.send(f"Your name: {game.player1.name}")
+        self.send(f"Opponent: {game.player2.name}")
+        if others:
+            self.send(f"Also at the table: {', '.join(others)}")
+        await self.pause(2)
+
+        while True:
+            turn = engine.next_turn(game)
+            await self.flush()
+            if turn is None:
+                break
+            player, target = turn
+            await self.perform(self.narrator.menu(player))
+            if player is game.player1:
+                choice = await self.read_choice()
+            else:
+                await self.pause(1)
+                choice = ai_decision_maker(player, target, game.ai_rng)
+            engine.player_turn(game, player, target, choice)
+            await self.flush()
+        self.broadcast.close()
+        return game
+
+
+class GameServer:
+    def __init__(self, speed=1.0, players=2, target=None, spectator_queue=SPECTATOR_QUEUE):
+        self.speed = speed
+        self.players = players
+        self.target = target
+        self.spectator_queue = spectator_queue
+        self.names = NameGenerator()  # Shared, so no two players in the lobby get the same name
+        self.numbers = itertools.count(1)
+        self.matches = set()
+
+    async def handle(self, reader, writer):
+        match = Match(reader, writer, self.speed, self.players, self.target, self.names, next(self.numbers),
+                      self.spectator_queue)
+        self.matches.add(match)
+        try:
+            await match.run()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            match.broadcast.close()
+            self.matches.discard(match)
+            writer.close()
+
+    async def spectate(self, reader, writer):
+        """Let a spectator pick a live match and stream it to them"""
+        def send(text=""):
+            writer.write((text + "\n").encode())
+
+        try:
+            live = sorted(self.matches, key=lambda match: match.number)
+            if not live:
+                send("No matches are being played right now.")
+                return
+            send("Live matches:")
+            for match in live:
+                send(f"  {match.number}: {match.title} ({len(match.broadcast.spectators)} watching)")
+            writer.write(b"Match to watch (Enter for the most watched): ")
+            await writer.drain()
+            answer = (await reader.readline()).decode(errors='replace').strip()
+            if answer:
+                match = next((m for m in self.matches if str(m.number) == answer), None)
+                if match is None:
+                    send(f"There is no live match {answer}.")
+                    return
+            else:
+                match = max(live, key=lambda m: (len(m.broadcast.spectators), m.number))
+            send(f"Watching match {match.number}: {match.title}")
+            send()
+            await match.broadcast.watch(writer)
+            send("The match is over. Thanks for watching!")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=7777, unix_path=None, watch_port=None):
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle, unix_path)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        servers = [server]
+        if watch_port:
+            servers.append(await asyncio.start_server(self.spectate, host, watch_port))
+        for listener in servers:
+            for sock in listener.sockets:
+                role = "spectators" if listener is not server else "roulette"
+                print(f"Serving {role} on {sock.getsockname()}")
+        async with AsyncExitStack() as stack:
+            for listener in servers:
+                await stack.enter_async_context(listener)  # Closes every listener on shutdown
+            await asyncio.gather(*(listener.serve_forever() for listener in servers))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host many roulette matches on one event loop")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--unix", help="listen on a Unix socket at this path instead of TCP")
+    parser.add_argument("--speed", type=float, default=1.0, help="speed up all pauses by this factor")
+    parser.add_argument("--weights", help="JSON file with event and hazard weights")
+    parser.add_argument("--players", type=int, default=2, help="players per table, including the human")
+    parser.add_argument("--target", choices=sorted(engine.TARGETS), default='default',
+                        help="how players pick who to shoot")
+    parser.add_argument("--watch-port", type=int, help="also let spectators watch live matches on this port")
+    parser.add_argument("--spectator-queue", type=int, default=SPECTATOR_QUEUE,
+                        help="frames a spectator may fall behind before skipping ahead")
+    args = parser.parse_args()
+    if args.weights:
+        engine.reload_weights(args.weights)
+    if args.players < 2:
+        parser.error("--players must be at least 2")
+
+    server = GameServer(args.speed, args.players, engine.TARGETS[args.target], args.spectator_queue)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix, args.watch_port))
+    except KeyboardInterrupt:
+        print("\nServer stopped.")
+
+
+if __name__ == "__main__":
+    main()
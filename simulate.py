@@ -0,0 +1,200 @@
+"""Headless batch simulation of many games across CPU cores.
+
+Games are split into fixed-size chunks for the workers. Every game's seed
+is derived directly from the run seed and the game's number (see
+streams.py), so a run is reproduced exactly by the same seed and game
+count whatever the worker count or chunk size, and with ``--record``
+every game also lands in a replay log (see replay.py).
+
+    python simulate.py --games 100000 --workers 8 --seed 42
+    python simulate.py --players 30 --target random   # battle-royale tables of bots
+"""
+import argparse
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import engine
+import replay
+from metrics import Metrics
+from stats import Stats
+from streams import game_seed
+
+CHUNK_SIZE = 1000
+
+
+def play_chunk(seed, start, count, weights=None, record=False, metrics=False, stats=False, players=2,
+               target='default'):
+    """Play games `start` to `start + count` of a run, with `players` bots each; returns their tallies as a Counter
+
+    With `record`, `metrics` or `stats`, returns (tallies, extras) instead,
+    where extras holds the chunk's replay log bytes under 'log', its metrics
+    snapshot (see metrics.py) under 'metrics' and its Stats (see stats.py)
+    under 'stats'.
+    """
+    if weights:
+        engine.set_weights(weights)
+    others = [f"Player {seat}" for seat in range(3, players + 1)]
+    target = engine.TARGETS[target]
+    totals = Counter()
+    log = []
+    probe = Metrics().install() if metrics else None
+    summary = Stats() if stats else None
+    try:
+        for number in range(start, start + count):
+            game = engine.GameState("Player 1", "Player 2", seed=game_seed(seed, number), others=others,
+                                    target=target)
+            decide = engine.ai_decide
+            if summary:
+                summary.attach(game)
+            if probe:
+                probe.attach(game)
+                decide = probe.timed('decision', decide)
+            if record:
+                decide = recorder = replay.Recorder(game, decide)
+            winners = engine.play(game, decide)
+            if record:
+                log.append(replay.encode(recorder.replay()))
+            if summary:
+                summary.add(game)
+            totals['games'] += 1
+            totals['turns'] += game.turn_count
+            if game.snoop_joined:
+                totals['snoop_joined'] += 1
+            if not winners:
+                totals['wipeout'] += 1
+            elif winners[0] is game.player1:
+                totals['player1'] += 1
+            elif winners[0] is game.player2:
+                totals['player2'] += 1
+            elif winners[0] is game.snoop:
+                totals['snoop'] += 1
+            else:
+                totals['others'] += 1
+    finally:
+        if probe:
+            probe.uninstall()
+    if record or metrics or stats:
+        return totals, {'log': b''.join(log), 'metrics': probe.as_dict() if probe else None, 'stats': summary}
+    return totals
+
+
+def chunks(games, chunk_size=CHUNK_SIZE):
+    """(first game number, game count) of every chunk"""
+    for start in range(0, games, chunk_size):
+        yield start, min(chunk_size, games - start)
+
+
+def run_jobs(func, jobs, workers, merge):
+    """Call func(*job) for every job on `workers` processes, passing each job and its result to merge() in order
+
+    Ctrl-C cancels the jobs that have not started yet.
+    """
+    if workers == 1:
+        for job in jobs:
+            merge(job, func(*job))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [(job, pool.submit(func, *job)) for job in jobs]
+        try:
+            for job, future in futures:
+                merge(job, future.result())
+        except KeyboardInterrupt:
+            for _, future in futures:
+                future.cancel()  # shutdown(cancel_futures=True) needs Python 3.9
+            pool.shutdown(wait=False)
+            raise
+
+
+def simulate(games, workers=None, seed=0, chunk_size=CHUNK_SIZE, weights=None, record=None, metrics=None,
+             stats=None, players=2, target='default'):
+    """Play `games` headless games on `workers` processes and merge the tallies
+
+    `weights` is an optional event/hazard weights config (see tables.py).
+    `record` is an optional replay log path; every game is appended to it in order.
+    `metrics` is an optional Metrics object that every chunk's timings and counters are merged into.
+    `stats` is an optional Stats object that every chunk's statistics are merged into.
+    `players` seats that many bots at every table, and `target` names their targeting (see engine.TARGETS).
+    """
+    workers = workers or os.cpu_count() or 1
+    plan = list(chunks(games, chunk_size))
+    totals = Counter()
+    log = open(record, 'ab') if record else None
+    extras = bool(log) or metrics is not None or stats is not None
+    args = (weights, bool(log), metrics is not None, stats is not None, players, target)
+
+    def merge(job, result):
+        if extras:
+            result, extra = result
+            if log:
+                log.write(extra['log'])
+            if metrics is not None:
+                metrics.merge(extra['metrics'])
+            if stats is not None:
+                stats.merge(extra['stats'])
+        totals.update(result)
+
+    try:
+        run_jobs(play_chunk, [(seed, start, count, *args) for start, count in plan], workers, merge)
+        return totals
+    finally:
+        if log:
+            log.close()
+
+
+def print_summary(totals, elapsed):
+    games = totals['games']
+    print(f"Games played:   {games}")
+    print(f"Elapsed:        {elapsed:.2f}s ({games / elapsed:,.0f} games/s)")
+    print(f"Average rounds: {totals['turns'] / games:.2f}")
+    for key, label in (('player1', "Player 1 wins"), ('player2', "Player 2 wins"),
+                       ('others', "Others win"), ('snoop', "Snoop Dogg wins"), ('wipeout', "Wipeouts"),
+                       ('snoop_joined', "Snoop joined")):
+        if key == 'others' and not totals[key]:
+            continue
+        print(f"{label + ':':<16}{totals[key] / games:7.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run headless roulette games in parallel")
+    parser.add_argument("-n", "--games", type=int, default=10000, help="number of games to play")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--seed", default="0", help="run seed; the same seed replays the same games")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="games per work unit")
+    parser.add_argument("--weights", help="JSON file with event and hazard weights")
+    parser.add_argument("--record", help="append a replay of every game to this log file")
+    parser.add_argument("--metrics", help="write phase timings and counters here (.json, otherwise Prometheus text)")
+    parser.add_argument("--stats", action="store_true",
+                        help="report survival curves, event/hazard rates and confidence intervals")
+    parser.add_argument("--stats-json", help="also write the statistics to this JSON file")
+    parser.add_argument("--players", type=int, default=2, help="bots per table")
+    parser.add_argument("--target", choices=sorted(engine.TARGETS), default='default',
+                        help="how players pick who to shoot")
+    args = parser.parse_args()
+    if args.players < 2:
+        parser.error("--players must be at least 2")
+    if args.record and (args.players != 2 or args.target != 'default'):
+        parser.error("--record only supports classic two-player games")
+    weights = engine.reload_weights(args.weights) if args.weights else None
+
+    start = time.perf_counter()
+    metrics = Metrics() if args.metrics else None
+    stats = Stats() if args.stats or args.stats_json else None
+    totals = simulate(args.games, args.workers, args.seed, args.chunk_size, weights, args.record, metrics, stats,
+                      args.players, args.target)
+    print_summary(totals, time.perf_counter() - start)
+    if metrics:
+        metrics.write(args.metrics)
+    if stats:
+        print()
+        print("\n".join(stats.report()))
+    if args.stats_json:
+        with open(args.stats_json, 'w') as f:
+            json.dump(stats.as_dict(), f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,447 @@
+"""Exact optimal play for the two-seat game, solved offline into a shared table.
+
+The solver enumerates every situation a player can face at their turn:
+whose turn it is, both players' lives, shield turns, drunk turns and
+missed-turn flags, and the hazard cooldown. It then runs value iteration
+with both players playing perfectly, using the current event and hazard
+weights and the misfire and hazard knobs of ``engine.RULES``. Every round
+in a chamber is an independent coin flip, so fired rounds say nothing
+about the next one and the chamber position drops out of the state. Snoop
+Dogg joining the table is treated as him walking away; once he has
+joined, PerfectAI falls back to the classic AI.
+
+The result is a flat table of 16-bit entries (best action plus the
+mover's win chance, with wipeouts counted as half a win) behind a small
+header. Lookups ``mmap`` the file, so any number of processes share one
+copy through the page cache, and each lookup is O(1) index arithmetic.
+
+Building needs NumPy, and so do batched lookups (PerfectAI.decide_batch);
+single lookups do not.
+
+    python solver.py --out policy.bin
+    python roulette.py --ai perfect --policy policy.bin
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import struct
+import sys
+import time
+from array import array
+
+import engine
+from engine import ACTIONS, ai_decision_maker, weights_digest
+from strategies import Strategy, ThresholdStrategy, numpy, subset
+
+MAGIC = b"RRPT"
+VERSION = 2
+HEADER = struct.Struct("<4sHH20s20s")  # magic, version, lives cap, weights digest, rules digest
+ENTRY = struct.Struct("<H")  # win chance in the top 14 bits, action index in the bottom 2
+LIVES_CAP = 6
+MAX_SHIELD = 2
+MAX_DRUNK = 3
+MAX_COOLDOWN = 5
+UNKNOWN = 0xFFFF  # Entry for a situation the solver never reaches
+SOLVED_RULES = ('misfire', 'hazard_chance', 'hazard_cooldown')  # Knobs of engine.RULES a solution depends on
+
+# Positions in a situation list
+L1, L2, S1, S2, D1, D2, M1, M2, CD = range(9)
+
+P1_WIN, P2_WIN, WIPEOUT = 'p1', 'p2', 'wipeout'
+
+
+def rules_digest():
+    """Fingerprint of the current values of the SOLVED_RULES knobs"""
+    rules = {name: getattr(engine.RULES, name) for name in SOLVED_RULES}
+    return hashlib.sha1(json.dumps(rules).encode()).digest()
+
+
+def radices(lives_cap):
+    """Mixed radix of a table index: seat, lives, shields, drunk turns, missed turns, cooldown"""
+    return (2, lives_cap + 1, lives_cap + 1, MAX_SHIELD + 1, MAX_SHIELD + 1,
+            MAX_DRUNK + 1, MAX_DRUNK + 1, 2, 2, MAX_COOLDOWN + 1)
+
+
+def table_index(seat, situation, lives_cap):
+    index = 0
+    for radix, value in zip(radices(lives_cap), (seat,) + tuple(situation)):
+        index = index * radix + value
+    return index
+
+
+# Game model, one chance outcome at a time
+
+def hit(st, seat, amount):
+    st = list(st)
+    if st[S1 + seat] > 0:
+        st[S1 + seat] -= 1
+    else:
+        st[L1 + seat] = max(0, st[L1 + seat] - amount)
+    return tuple(st)
+
+
+def hit_both(st, amount):
+    return hit(hit(st, 0, amount), 1, amount)
+
+
+def gain_life(st, seat, cap):
+    st = list(st)
+    st[L1 + seat] = min(cap, st[L1 + seat] + 1)
+    return tuple(st)
+
+
+def set_value(st, position, value):
+    st = list(st)
+    st[position] = value
+    return tuple(st)
+
+
+def event_outcomes(st, cap):
+    """(probability, situation) pairs for one spin of the event wheel"""
+    outcomes = []
+    for name, weight in zip(engine.EVENTS.names, engine.EVENTS.probabilities()):
+        if not weight:
+            continue
+        if name == "mysterious_man":
+            branches = [(0.5, hit(st, 0, 2)), (0.5, hit(st, 1, 2))]
+        elif name == "nothing":
+            branches = [(1.0, st)]
+        elif name == "potion":
+            branches = [(1 / 3, gain_life(st, 0, cap)), (1 / 3, gain_life(st, 1, cap)), (1 / 3, st)]
+        elif name == "earthquake":
+            branches = [(1.0, hit_both(st, 1))]
+        elif name == "animal":
+            branches = [(0.5, hit(st, 0, 1)), (0.5, hit(st, 1, 1))]
+        elif name == "shield":
+            branches = [(0.25, set_value(st, S1 + seat, turns)) for seat in (0, 1) for turns in (1, 2)]
+        else:  # snoop_dogg: fallout, shoots both, duel (no effect) or joins (treated as leaving)
+            branches = [(0.125, hit(st, 0, 1)), (0.125, hit(st, 1, 1)),
+                        (0.25, hit_both(st, 1)), (0.5, st)]
+        outcomes.extend((weight * p, result) for p, result in branches)
+    return outcomes
+
+
+def action_outcomes(st, seat, action, cap):
+    """Outcomes of the mover in `seat` committing to action '1', '2' or '3'"""
+    if action == '3':
+        return event_outcomes(st, cap)
+    victim = seat if action == '1' else 1 - seat
+    # A misfire and an empty round both leave the situation unchanged; rounds are loaded half the time
+    bang = (1 - engine.RULES.misfire) / 2
+    return [(1 - bang, st), (bang, hit(st, victim, 1))]
+
+
+def hazard_outcomes(st):
+    """Outcomes of one environmental hazard, before the cooldown is set"""
+    outcomes = []
+    for name, weight in zip(engine.HAZARDS.names, engine.HAZARDS.probabilities()):
+        if not weight:
+            continue
+        if name == "Lightning Storm":
+            branches = [(0.5, hit(st, 0, 1)), (0.5, hit(st, 1, 1))]
+        elif name == "Gas Leak":
+            per_seat = [[(0.3, None)] + [(0.7 / 3, turns) for turns in (1, 2, 3)] for _ in (0, 1)]
+            branches = []
+            for p1, turns1 in per_seat[0]:
+                for p2, turns2 in per_seat[1]:
+                    result = st
+                    if turns1:
+                        result = set_value(result, D1, turns1)
+                    if turns2:
+                        result = set_value(result, D2, turns2)
+                    branches.append((p1 * p2, result))
+        elif name == "Power Outage":
+            branches = [(0.6, st), (0.2, set_value(st, M1, 1)), (0.2, set_value(st, M2, 1))]
+        elif name == "Earthquake":
+            branches = []
+            for fall1 in (True, False):
+                for fall2 in (True, False):
+                    result = st
+                    if fall1:
+                        result = hit(result, 0, 1)
+                    if fall2:
+                        result = hit(result, 1, 1)
+                    branches.append(((0.6 if fall1 else 0.4) * (0.6 if fall2 else 0.4), result))
+        else:  # Toxic Rain
+            branches = [(1.0, hit_both(st, 1))]
+        outcomes.extend((weight * p, result) for p, result in branches)
+    return outcomes
+
+
+def outcome_node(st):
+    """Terminal node for a finished game, or None while both players are alive"""
+    alive1, alive2 = st[L1] > 0, st[L2] > 0
+    if alive1 and alive2:
+        return None
+    if alive1:
+        return P1_WIN
+    if alive2:
+        return P2_WIN
+    return WIPEOUT
+
+
+def end_turn(st, seat):
+    """Node reached once the player in `seat` has finished their turn"""
+    st = list(st)
+    st[D1 + seat] = max(0, st[D1 + seat] - 1)
+    st[M1 + seat] = 0
+    st = tuple(st)
+    over = outcome_node(st)
+    if over:
+        return over
+    if seat == 0:
+        return ('turn', 1, st)
+    return ('round', st)
+
+
+def expand(node, cap):
+    """Chance branches of a node: a list of outcome lists, one per available action"""
+    kind = node[0]
+    if kind == 'round':
+        st = node[1]
+        cooldown = st[CD]
+        if cooldown > 0:
+            return [[(1.0, ('turn', 0, set_value(st, CD, cooldown - 1)))]]
+        chance = engine.RULES.hazard_chance
+        low, high = engine.RULES.hazard_cooldown
+        cooldowns = range(low, high + 1)
+        branches = [(1 - chance, ('turn', 0, st))]
+        for p, result in hazard_outcomes(st):
+            over = outcome_node(result)
+            for new_cooldown in cooldowns:
+                branches.append((chance * p / len(cooldowns),
+                                 over or ('turn', 0, set_value(result, CD, new_cooldown))))
+        return [branches]
+
+    _, seat, st = node
+    if st[M1 + seat]:
+        return [[(1.0, end_turn(st, seat))]]  # Missed turn, nothing to decide
+
+    per_action = []
+    for action in ACTIONS:
+        if st[D1 + seat] > 0:
+            # Drunk: 40% chance of doing one of the other two actions instead
+            mix = [(0.6 if other == action else 0.2, other) for other in ACTIONS]
+        else:
+            mix = [(1.0, action)]
+        branches = []
+        for p_action, actual in mix:
+            for p, result in action_outcomes(st, seat, actual, cap):
+                branches.append((p_action * p, end_turn(result, seat)))
+        per_action.append(branches)
+    return per_action
+
+
+def solve(lives_cap=LIVES_CAP, tolerance=1e-12, max_sweeps=100000):
+    """Value-iterate every situation reachable from an even start
+
+    Returns {decision node: (best action, mover's win chance)}.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("solver.py needs NumPy to build a table: pip install numpy") from None
+    if engine.RULES.hazard_cooldown[1] > MAX_COOLDOWN:
+        raise ValueError(f"The table tracks hazard cooldowns up to {MAX_COOLDOWN} rounds")
+
+    terminals = {P1_WIN: 1.0, P2_WIN: 0.0, WIPEOUT: 0.5}  # Player 1's score
+    nodes = list(terminals)
+    index = {node: i for i, node in enumerate(nodes)}
+    kinds = [3, 3, 3]  # 0: player 1 picks the max, 1: player 2 picks the min, 2: chance, 3: terminal
+    rows, probs, targets = [], [], []
+
+    queue = []
+    for lives in range(1, lives_cap + 1):
+        start = ('round', (lives, lives, 0, 0, 0, 0, 0, 0, 0))
+        index[start] = len(nodes)
+        nodes.append(start)
+        kinds.append(None)
+        queue.append(start)
+    while queue:
+        node = queue.pop()
+        i = index[node]
+        per_action = expand(node, lives_cap)
+        kinds[i] = node[1] if len(per_action) == 3 else 2
+        for action, branches in enumerate(per_action):
+            for p, child in branches:
+                j = index.get(child)
+                if j is None:
+                    j = index[child] = len(nodes)
+                    nodes.append(child)
+                    kinds.append(None)
+                    queue.append(child)
+                rows.append(i * 3 + action)
+                probs.append(p)
+                targets.append(j)
+
+    count = len(nodes)
+    kinds = np.array(kinds, dtype=np.int8)
+    rows = np.array(rows, dtype=np.int64)
+    probs = np.array(probs)
+    targets = np.array(targets, dtype=np.int64)
+    fixed = np.array(list(terminals.values()))
+    maximize, minimize = kinds == 0, kinds == 1
+
+    values = np.zeros(count)
+    values[:3] = fixed
+    for _ in range(max_sweeps):
+        q = np.bincount(rows, weights=probs * values[targets], minlength=count * 3).reshape(count, 3)
+        new = q[:, 0].copy()
+        new[maximize] = q[maximize].max(axis=1)
+        new[minimize] = q[minimize].min(axis=1)
+        new[:3] = fixed
+        delta = np.abs(new - values).max()
+        values = new
+        if delta < tolerance:
+            break
+
+    q = np.bincount(rows, weights=probs * values[targets], minlength=count * 3).reshape(count, 3)
+    policy = {}
+    for i in np.flatnonzero(maximize | minimize):
+        node = nodes[i]
+        seat = node[1]
+        if seat == 0:
+            best = int(q[i].argmax())
+            policy[node] = (ACTIONS[best], float(q[i, best]))
+        else:
+            best = int(q[i].argmin())
+            policy[node] = (ACTIONS[best], 1.0 - float(q[i, best]))
+    return policy
+
+
+def write_table(path, policy, lives_cap=LIVES_CAP):
+    """Pack a solved policy into the flat binary table format"""
+    size = 1
+    for radix in radices(lives_cap):
+        size *= radix
+    entries = array('H', [UNKNOWN]) * size
+    for (_, seat, situation), (action, win) in policy.items():
+        entries[table_index(seat, situation, lives_cap)] = (round(win * 0x3FFF) << 2) | ACTIONS.index(action)
+    if sys.byteorder != 'little':
+        entries.byteswap()
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, lives_cap, weights_digest(), rules_digest()))
+        entries.tofile(f)
+
+
+class PolicyTable:
+    """Read-only, memory-mapped view of a solved policy table"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.lives_cap, self.digest, self.rules = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} policy table")
+        self.radices = radices(self.lives_cap)
+        self.array = None
+
+    def close(self):
+        self.array = None
+        self.data.close()
+
+    def entries(self):
+        """Every entry as a NumPy array backed by the mapping"""
+        if self.array is None:
+            np = numpy()
+            self.array = np.frombuffer(self.data, dtype='<u2', offset=HEADER.size)
+        return self.array
+
+    def matches_weights(self):
+        """True if the table was solved for the current event and hazard weights"""
+        return self.digest == weights_digest()
+
+    def matches_rules(self):
+        """True if the table was solved for the current misfire and hazard knobs"""
+        return self.rules == rules_digest()
+
+    def lookup(self, game, player):
+        """(best action, win chance) for `player` to move, or None if the table has no answer"""
+        if len(game.seated) != 2 or (game.snoop_joined and game.snoop and game.snoop.is_alive()):
+            return None
+        seat = game.seat_of(player)
+        if seat > 1:
+            return None
+        cap = self.lives_cap
+        index = 0
+        for radix, value in zip(self.radices, (
+                seat,
+                min(game.player1.lives, cap), min(game.player2.lives, cap),
+                min(game.player1.shield_turns, MAX_SHIELD), min(game.player2.shield_turns, MAX_SHIELD),
+                min(game.player1.drunk_turns, MAX_DRUNK), min(game.player2.drunk_turns, MAX_DRUNK),
+                int(game.player1.misses_next_turn), int(game.player2.misses_next_turn),
+                min(game.hazard_cooldown, MAX_COOLDOWN))):
+            index = index * radix + value
+        entry, = ENTRY.unpack_from(self.data, HEADER.size + 2 * index)
+        if entry == UNKNOWN:
+            return None
+        return ACTIONS[entry & 3], (entry >> 2) / 0x3FFF
+
+
+class PerfectAI(Strategy):
+    """Plays the solved policy, falling back to the classic AI where the table has no answer"""
+
+    name = 'perfect'
+
+    def __init__(self, path, strict=True):
+        self.table = PolicyTable(path)
+        self.fallback = ThresholdStrategy()
+        if strict and not self.table.matches_weights():
+            raise ValueError(f"{path} was solved for different event/hazard weights; rebuild it with solver.py")
+        if strict and not self.table.matches_rules():
+            raise ValueError(f"{path} was solved for different misfire/hazard rules; rebuild it with solver.py")
+
+    def decide(self, game, player, target):
+        answer = self.table.lookup(game, player)
+        if answer is None:
+            return ai_decision_maker(player, target, game.ai_rng)
+        return answer[0]
+
+    def decide_batch(self, situations, rng):
+        """Look up every row at once; the index arithmetic of lookup() done on whole columns"""
+        np = numpy()
+        cap = self.table.lives_cap
+        lives, shields, drunk, misses = (situations.lives, situations.shield_turns, situations.drunk_turns,
+                                         situations.misses)
+        columns = (
+            (lives[:, 0], cap), (lives[:, 1], cap),
+            (shields[:, 0], MAX_SHIELD), (shields[:, 1], MAX_SHIELD),
+            (drunk[:, 0], MAX_DRUNK), (drunk[:, 1], MAX_DRUNK),
+            (misses[:, 0], 1), (misses[:, 1], 1),
+            (situations.hazard_cooldown, MAX_COOLDOWN),
+        )
+        index = situations.seat.astype(np.int64)
+        for radix, (column, limit) in zip(self.table.radices[1:], columns):
+            index = index * radix + np.clip(column, 0, limit)
+        entry = self.table.entries()[index]
+        choice = (entry & 3).astype(np.int8) + 1
+        unknown = np.flatnonzero(entry == UNKNOWN)
+        if len(unknown):
+            choice[unknown] = self.fallback.decide_batch(subset(situations, unknown), rng)
+        return choice
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve the two-seat game exactly and write a policy table")
+    parser.add_argument("--out", default="policy.bin", help="where to write the table")
+    parser.add_argument("--lives-cap", type=int, default=LIVES_CAP, help="highest life count tracked")
+    parser.add_argument("--weights", help="JSON file with event and hazard weights")
+    args = parser.parse_args()
+    if args.weights:
+        engine.reload_weights(args.weights)
+
+    start = time.perf_counter()
+    policy = solve(args.lives_cap)
+    write_table(args.out, policy, args.lives_cap)
+    print(f"Solved {len(policy):,} situations in {time.perf_counter() - start:.1f}s -> {args.out}")
+    table = PolicyTable(args.out)
+    game = engine.GameState("Player 1", "Player 2")
+    game.hazard_cooldown = 0
+    action, win = table.lookup(game, game.player1)
+    print(f"Opening move for player 1: {action} (wins {win:.1%} against perfect play)")
+    table.close()
+
+
+if __name__ == "__main__":
+    main()
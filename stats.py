@@ -0,0 +1,249 @@
+"""Constant-memory statistics for large simulation runs.
+
+Every statistic is kept in a fixed-size summary that is updated one game
+at a time: Welford's running mean and variance, fixed-bin histograms for
+game lengths and elimination rounds, and plain counts for outcomes,
+events and hazards. Memory does not grow with the number of games, and
+two summaries combine with ``merge``, so every worker can keep its own and
+the results are added up at the end.
+
+Proportions come with Wilson score intervals and means with normal
+intervals, all at 95% by default.
+
+    stats = Stats()
+    for _ in range(games):
+        game = GameState("A", "B")
+        stats.attach(game)          # optional: event/hazard counts, exact elimination rounds
+        engine.play(game)
+        stats.add(game)
+    print("\\n".join(stats.report()))
+"""
+import math
+from collections import Counter
+
+import engine
+
+Z95 = 1.959963984540054
+MAX_ROUNDS = 200  # Rounds tracked one by one; longer games share the last histogram bin
+SEATS = ('player1', 'player2')
+OUTCOMES = ('player1', 'player2', 'others', 'snoop', 'wipeout')
+SURVIVAL_ROUNDS = (1, 2, 3, 5, 10, 20, 50)
+
+
+def wilson(successes, trials, z=Z95):
+    """(proportion, low, high) with a Wilson score interval"""
+    if not trials:
+        return 0.0, 0.0, 1.0
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    half = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return p, max(0.0, centre - half), min(1.0, centre + half)
+
+
+class Welford:
+    """Running count, mean and variance"""
+
+    __slots__ = ('count', 'mean', 'm2', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """Chan et al.'s parallel combination of two running summaries"""
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def stdev(self):
+        return math.sqrt(self.variance())
+
+    def interval(self, z=Z95):
+        """(mean, low, high) for the mean"""
+        half = z * self.stdev() / math.sqrt(self.count) if self.count else 0.0
+        return self.mean, self.mean - half, self.mean + half
+
+
+class Histogram:
+    """Counts of small non-negative integers; values >= `bins` share the last bin"""
+
+    __slots__ = ('counts',)
+
+    def __init__(self, bins=MAX_ROUNDS):
+        self.counts = [0] * (bins + 1)
+
+    def add(self, value):
+        self.counts[min(value, len(self.counts) - 1)] += 1
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+
+    def total(self):
+        return sum(self.counts)
+
+    def above(self, value):
+        """How many values are greater than `value`"""
+        return sum(self.counts[value + 1:])
+
+    def quantile(self, q):
+        target = q * self.total()
+        seen = 0
+        for value, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= target:
+                return value
+        return len(self.counts) - 1
+
+
+class Stats:
+    """Mergeable summary of many finished games"""
+
+    def __init__(self, max_rounds=MAX_ROUNDS):
+        self.games = 0
+        self.outcomes = Counter()
+        self.snoop_joined = 0
+        self.length = Welford()  # Rounds per game
+        self.lengths = Histogram(max_rounds)
+        # Round each seat was eliminated in; the last bin also holds seats that were never eliminated
+        self.eliminated = {seat: Histogram(max_rounds) for seat in SEATS}
+        self.events = Counter()
+        self.hazards = Counter()
+        self.elimination_rounds = {}  # id(game) -> {id(player): round}, for attached games still running
+
+    def attach(self, game):
+        """Count `game`'s events and hazards and note when each seat goes out"""
+        downstream = game.emit
+        out = self.elimination_rounds[id(game)] = {}
+
+        def emit(event):
+            kind = type(event)
+            if kind is engine.EventSpun:
+                self.events[event.name] += 1
+            elif kind is engine.HazardStruck:
+                self.hazards[event.name] += 1
+            elif kind is engine.Damaged and event.player.lives <= 0:
+                out.setdefault(id(event.player), game.turn_count)
+            if downstream:
+                downstream(event)
+        game.emit = emit
+        return game
+
+    def add(self, game):
+        """Fold one finished game into the summary"""
+        self.games += 1
+        self.length.add(game.turn_count)
+        self.lengths.add(game.turn_count)
+        winners = game.winners
+        if not winners:
+            self.outcomes['wipeout'] += 1
+        elif winners[0] is game.player1:
+            self.outcomes['player1'] += 1
+        elif winners[0] is game.player2:
+            self.outcomes['player2'] += 1
+        elif winners[0] is game.snoop:
+            self.outcomes['snoop'] += 1
+        else:
+            self.outcomes['others'] += 1
+        if game.snoop_joined:
+            self.snoop_joined += 1
+
+        out = self.elimination_rounds.pop(id(game), {})
+        last_bin = len(self.lengths.counts) - 1
+        for seat, player in zip(SEATS, (game.player1, game.player2)):
+            if player.is_alive():
+                self.eliminated[seat].add(last_bin)
+            else:
+                self.eliminated[seat].add(out.get(id(player), game.turn_count))
+
+    def merge(self, other):
+        self.games += other.games
+        self.outcomes.update(other.outcomes)
+        self.snoop_joined += other.snoop_joined
+        self.length.merge(other.length)
+        self.lengths.merge(other.lengths)
+        for seat in SEATS:
+            self.eliminated[seat].merge(other.eliminated[seat])
+        self.events.update(other.events)
+        self.hazards.update(other.hazards)
+
+    def survival(self, rounds=SURVIVAL_ROUNDS):
+        """Share of games still running after each round, and of each seat still alive"""
+        curves = {'game': [wilson(self.lengths.above(t), self.games) for t in rounds]}
+        for seat in SEATS:
+            curves[seat] = [wilson(self.eliminated[seat].above(t), self.games) for t in rounds]
+        return curves
+
+    def as_dict(self):
+        """Every estimate with its interval, ready for json.dump"""
+        mean, low, high = self.length.interval()
+        spins = sum(self.events.values())
+        struck = sum(self.hazards.values())
+        return {
+            'games': self.games,
+            'outcomes': {name: wilson(self.outcomes[name], self.games) for name in OUTCOMES},
+            'snoop_joined': wilson(self.snoop_joined, self.games),
+            'rounds': {
+                'mean': [mean, low, high], 'stdev': self.length.stdev(),
+                'min': self.length.min, 'max': self.length.max,
+                'median': self.lengths.quantile(0.5), 'p90': self.lengths.quantile(0.9),
+                'p99': self.lengths.quantile(0.99), 'histogram': self.lengths.counts,
+            },
+            'survival': {'rounds': list(SURVIVAL_ROUNDS), **self.survival()},
+            'events': {name: wilson(count, spins) for name, count in sorted(self.events.items())},
+            'hazards': {name: wilson(count, struck) for name, count in sorted(self.hazards.items())},
+        }
+
+    def report(self):
+        """Human-readable summary lines"""
+        def share(estimate):
+            p, low, high = estimate
+            return f"{p:7.2%}  [{low:6.2%}, {high:6.2%}]"
+
+        lines = [f"Games:           {self.games}"]
+        if not self.games:
+            return lines
+        mean, low, high = self.length.interval()
+        lines.append(f"Rounds per game: {mean:.3f}  [{low:.3f}, {high:.3f}]  sd {self.length.stdev():.2f}, "
+                     f"median {self.lengths.quantile(0.5)}, p90 {self.lengths.quantile(0.9)}, "
+                     f"p99 {self.lengths.quantile(0.99)}, max {self.length.max}")
+        for name, label in zip(OUTCOMES, ("Player 1 wins", "Player 2 wins", "Others win", "Snoop Dogg wins",
+                                          "Wipeouts")):
+            if name == 'others' and not self.outcomes[name]:
+                continue
+            lines.append(f"{label + ':':<17}{share(wilson(self.outcomes[name], self.games))}")
+        lines.append(f"{'Snoop joined:':<17}{share(wilson(self.snoop_joined, self.games))}")
+
+        lines.append("Survival after round:  " + "".join(f"{t:>9}" for t in SURVIVAL_ROUNDS))
+        for name, curve in self.survival().items():
+            lines.append(f"  {name:<21}" + "".join(f"{p:>9.2%}" for p, _, _ in curve))
+
+        for title, counts in (("Events", self.events), ("Hazards", self.hazards)):
+            total = sum(counts.values())
+            if total:
+                lines.append(f"{title} ({total} total):")
+                for name, count in counts.most_common():
+                    lines.append(f"  {name + ':':<17}{share(wilson(count, total))}")
+        return lines
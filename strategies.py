@@ -0,0 +1,146 @@
+"""AI strategies that decide one turn at a time or a whole batch at once.
+
+A strategy is called like any decide function: ``strategy(game, player,
+target)`` returns '1', '2' or '3'. That means it plugs into engine.play,
+TerminalView, the server and the tournament unchanged. A strategy can also
+answer ``decide_batch(situations, rng)``. That takes a Situations of NumPy
+arrays with one row per decision and returns an array of actions 1-3.
+batch.py plays each seat of thousands of games through that path, so a
+table-driven or learned policy costs a few array operations per turn
+instead of one Python call per game.
+
+Subclasses implement decide(), decide_batch(), or both. A strategy that
+only has decide_batch() still plays single games: each decision becomes a
+batch of one.
+
+    python batch.py --games 1000000 --strategy perfect --opponent classic
+"""
+from collections import namedtuple
+
+import engine
+from engine import ACTIONS, ai_decision_maker
+
+# One row per decision in a two-seat game. `seat` is the mover's seat (0 or 1),
+# per-seat fields are (n, 2) arrays indexed by seat, the rest are (n,) arrays.
+Situations = namedtuple('Situations', 'seat lives shield_turns drunk_turns misses hazard_cooldown bullets_left')
+
+
+def numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("Batched decisions need NumPy: pip install numpy") from None
+    return np
+
+
+def situations_of(decisions):
+    """Situations for a list of (game, player) decisions in two-seat games"""
+    np = numpy()
+    n = len(decisions)
+    seat = np.empty(n, dtype=np.int8)
+    lives = np.empty((n, 2), dtype=np.int16)
+    shield_turns = np.empty((n, 2), dtype=np.int8)
+    drunk_turns = np.empty((n, 2), dtype=np.int8)
+    misses = np.empty((n, 2), dtype=bool)
+    hazard_cooldown = np.empty(n, dtype=np.int8)
+    bullets_left = np.empty(n, dtype=np.int8)
+    for i, (game, player) in enumerate(decisions):
+        seat[i] = player.seat
+        for s, p in enumerate((game.player1, game.player2)):
+            lives[i, s] = p.lives
+            shield_turns[i, s] = p.shield_turns
+            drunk_turns[i, s] = p.drunk_turns
+            misses[i, s] = p.misses_next_turn
+        hazard_cooldown[i] = game.hazard_cooldown
+        bullets_left[i] = len(game.bullets) - game.current_bullet
+    return Situations(seat, lives, shield_turns, drunk_turns, misses, hazard_cooldown, bullets_left)
+
+
+def subset(batch, rows):
+    """The rows of a Situations selected by an index or mask array"""
+    return Situations(*(field[rows] for field in batch))
+
+
+class Strategy:
+    """Base class for AI strategies"""
+
+    name = None
+
+    def __call__(self, game, player, target):
+        return self.decide(game, player, target)
+
+    def decide(self, game, player, target):
+        """One decision, made as a batch of one"""
+        if len(game.seated) != 2 or player.seat > 1:
+            return ai_decision_maker(player, target, game.ai_rng)  # Not a two-seat situation
+        rng = numpy().random.default_rng(game.ai_rng.getrandbits(64))
+        return ACTIONS[int(self.decide_batch(situations_of([(game, player)]), rng)[0]) - 1]
+
+    def new_game(self):
+        """Called before each game of a series; strategies that learn as they play forget it here"""
+
+    def decide_batch(self, situations, rng):
+        raise NotImplementedError(f"the {self.name or type(self).__name__} strategy has no batched decisions")
+
+
+class ThresholdStrategy(Strategy):
+    """The classic AI: gamble when desperate, finish off a weak opponent, otherwise mostly shoot yourself"""
+
+    name = 'classic'
+
+    def decide(self, game, player, target):
+        return ai_decision_maker(player, target, game.ai_rng)
+
+    def decide_batch(self, situations, rng):
+        """Vectorized ai_decision_maker"""
+        np = numpy()
+        n = len(situations.seat)
+        rows = np.arange(n)
+        seat = situations.seat
+        own = situations.lives[rows, seat]
+        other = situations.lives[rows, 1 - seat]
+        confused = situations.drunk_turns[rows, seat] > 0
+        rules = engine.RULES
+        return np.select(
+            [confused,
+             own <= 1,
+             (other <= 1) & (rng.random(n) < rules.ai_finish),
+             (own >= 3) & (rng.random(n) < rules.ai_confident),
+             rng.random(n) < rules.ai_gamble],
+            [rng.integers(1, 4, size=n), 3, 2, 2, 3],
+            default=1,
+        )
+
+
+class RandomStrategy(Strategy):
+    """Any action at random; the floor every other strategy should beat"""
+
+    name = 'random'
+
+    def decide(self, game, player, target):
+        return game.ai_rng.choice(ACTIONS)
+
+    def decide_batch(self, situations, rng):
+        return rng.integers(1, 4, size=len(situations.seat))
+
+
+STRATEGIES = ('classic', 'random', 'mcts', 'perfect')
+BATCHED = ('classic', 'random', 'perfect')  # Strategies with decide_batch()
+
+
+def make(name, think_ms=20, policy="policy.bin", rollouts=None):
+    """Build the strategy called `name`; mcts and perfect are imported only when asked for
+
+    With `rollouts`, mcts plays that many rollouts per move instead of thinking for `think_ms`.
+    """
+    if name == 'classic':
+        return ThresholdStrategy()
+    if name == 'random':
+        return RandomStrategy()
+    if name == 'mcts':
+        from mcts import MCTSAI
+        return MCTSAI(budget=think_ms / 1000, rollouts=rollouts)
+    if name == 'perfect':
+        from solver import PerfectAI
+        return PerfectAI(policy)
+    raise ValueError(f"Unknown strategy {name!r}")
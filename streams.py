@@ -0,0 +1,136 @@
+"""Counter-based random streams, one per subsystem of every game.
+
+A CounterRNG draw is a pure function of the stream's key and its
+position: draw n is SplitMix64's output function applied to
+``key + n * GAMMA``. That has two consequences:
+
+- Jumping to any position is O(1). There is no state to roll forward.
+- Streams split off by name or number get keys that are hashes of their
+  parent's key, so they never share draws in practice.
+
+Every game splits its seed into one stream per subsystem: the chamber,
+misfires, event picks, hazards, other rule coin flips (targets, drunk
+fumbles) and the AI. At the start of every round each stream jumps to
+position ``(round, 0)``. So turning the AI, an animation or an extra
+event draw on or off in one round cannot change what any later round
+rolls. A run of many games derives each game's seed from the run seed and
+the game's number in the same way. Game N of a run is therefore
+reproducible without playing games 0 to N-1.
+
+CounterRNG subclasses ``random.Random``, so choice, randint, sample and
+the rest all work on it.
+"""
+import hashlib
+import random
+
+MASK64 = (1 << 64) - 1
+GAMMA = 0x9E3779B97F4A7C15
+TURN_BITS = 32  # Draws per stream per round before the next round's draws begin
+
+SUBSYSTEMS = ('rules', 'chamber', 'misfire', 'event', 'hazard', 'ai')
+
+
+def mix64(z):
+    """SplitMix64's output function: a bijective 64-bit scramble"""
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+
+def key_of(value):
+    """64-bit key for an int, or for anything else by way of its string form
+
+    A string of digits keys like the int it spells, so ``--seed 42`` on the
+    command line plays the same games as ``seed=42`` in code.
+    """
+    if isinstance(value, str) and (value[1:] if value.startswith('-') else value).isdecimal():
+        value = int(value)
+    if isinstance(value, int):
+        return mix64(value & MASK64)
+    return int.from_bytes(hashlib.sha256(str(value).encode()).digest()[:8], 'little')
+
+
+def derive(key, label):
+    """Key of the child stream called `label` (an int or a string)"""
+    return mix64(key ^ mix64((key_of(label) + GAMMA) & MASK64))
+
+
+class CounterRNG(random.Random):
+    """random.Random whose nth draw depends only on (key, n)"""
+
+    def __init__(self, seed=None, counter=0):
+        self.key = 0
+        super().__init__(seed)
+        self.counter = counter
+
+    def seed(self, a=None, version=2):
+        self.key = key_of(a if a is not None else random.getrandbits(64))
+        self.counter = 0
+
+    def getstate(self):
+        return self.key, self.counter
+
+    def setstate(self, state):
+        self.key, self.counter = state
+
+    def next64(self):
+        self.counter += 1
+        z = (self.key + self.counter * GAMMA) & MASK64
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+        return z ^ (z >> 31)
+
+    def random(self):
+        return (self.next64() >> 11) * (1.0 / (1 << 53))
+
+    def getrandbits(self, k):
+        if k <= 64:
+            return self.next64() >> (64 - k) if k else 0
+        bits = 0
+        for shift in range(0, k, 64):
+            bits |= self.next64() << shift
+        return bits & ((1 << k) - 1)
+
+    def seek(self, turn, draw=0):
+        """Jump to draw `draw` of round `turn`"""
+        self.counter = (turn << TURN_BITS) + draw
+
+    def split(self, label):
+        """Independent child stream called `label`"""
+        child = CounterRNG.__new__(CounterRNG)
+        child.key = derive(self.key, label)
+        child.counter = 0
+        return child
+
+
+class Streams:
+    """One random stream per subsystem of a game (see SUBSYSTEMS)"""
+
+    __slots__ = SUBSYSTEMS + ('counter_based',)
+
+    def __init__(self, seed=None):
+        root = CounterRNG(seed)
+        for name in SUBSYSTEMS:
+            setattr(self, name, root.split(name))
+        self.counter_based = True
+
+    @classmethod
+    def shared(cls, rng):
+        """Every rule subsystem drawing from one ordinary `rng`, in order; the AI gets its own"""
+        streams = cls.__new__(cls)
+        for name in SUBSYSTEMS:
+            setattr(streams, name, rng)
+        streams.ai = random.Random(rng.getrandbits(64))
+        streams.counter_based = False
+        return streams
+
+    def seek(self, turn):
+        """Move every stream to the start of round `turn`; a no-op for shared streams"""
+        if self.counter_based:
+            for name in SUBSYSTEMS:
+                getattr(self, name).counter = turn << TURN_BITS
+
+
+def game_seed(run_seed, number):
+    """Seed of game `number` in a run, computed directly from the run seed"""
+    return derive(key_of(run_seed), number)
@@ -0,0 +1,212 @@
+"""Parameter sweeps over the balance knobs, cached on disk.
+
+Every combination of the values given for each knob (see engine.Rules) is
+one configuration. Each configuration is simulated headless for
+``--games`` games, with the chunks of every configuration spread over the
+worker processes. Every configuration plays the same game seeds (see
+streams.py), so the differences between them come from the knobs rather
+than from luck.
+
+A configuration's totals are written to the cache directory as soon as its
+last chunk is in. The cache key is a hash of the knobs, the game count,
+seed, table size, targeting, the event/hazard weights and the source of
+the modules that decide a game's outcome. Running a sweep again, or one
+that overlaps an earlier sweep, only plays the configurations not seen
+before; editing the rules invalidates every entry.
+
+    python sweep.py --misfire 0.05 0.1 0.15 --lives 2 3 4 -n 20000
+    python sweep.py --hazard-cooldown 2-4 3-5 --ai-gamble 0.2 0.3 --json sweep.json
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from collections import Counter
+from itertools import product
+
+import engine
+import simulate
+import streams
+import tables
+from engine import DEFAULT_RULES, Rules
+
+CACHE_DIR = "sweep-cache"
+SOURCES = (engine, simulate, streams, tables)  # Modules whose code decides the results
+
+
+def code_version():
+    """Fingerprint of the source of every module in SOURCES"""
+    digest = hashlib.sha1()
+    for module in SOURCES:
+        with open(module.__file__, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def grid(**values):
+    """Rules for every combination of `values`, a {knob: [value, ...]} mapping; missing knobs keep their default"""
+    axes = [values.get(name) or [default] for name, default in zip(Rules._fields, DEFAULT_RULES)]
+    return list(dict.fromkeys(Rules(*point) for point in product(*axes)))
+
+
+def as_config(rules):
+    """Rules as a JSON-friendly {knob: value} dict"""
+    return dict(rules._asdict(), hazard_cooldown=list(rules.hazard_cooldown))
+
+
+def cache_key(rules, games, seed, players=2, target='default', code=None):
+    """Hash of everything that decides a configuration's totals"""
+    key = {
+        'rules': as_config(rules), 'games': games, 'seed': str(seed), 'players': players, 'target': target,
+        'weights': engine.weights_digest().hex(), 'code': code or code_version(),
+    }
+    return hashlib.sha1(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+
+class Cache:
+    """One JSON file of totals per configuration, named by its cache key"""
+
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = directory
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        try:
+            with open(self.path(key)) as f:
+                return Counter(json.load(f)['totals'])
+        except (OSError, ValueError, KeyError):
+            return None  # Missing or unreadable entries are simply played again
+
+    def put(self, key, rules, totals):
+        os.makedirs(self.directory, exist_ok=True)
+        temp = f"{self.path(key)}.tmp"
+        with open(temp, 'w') as f:
+            json.dump({'rules': as_config(rules), 'totals': totals}, f, indent=2)
+        os.replace(temp, self.path(key))  # An interrupted write never leaves a broken entry
+
+
+def play_chunk(rules, seed, start, count, weights=None, players=2, target='default'):
+    """simulate.play_chunk under `rules`"""
+    previous = engine.RULES
+    engine.set_rules(rules._asdict())
+    try:
+        return simulate.play_chunk(seed, start, count, weights, players=players, target=target)
+    finally:
+        engine.set_rules(previous._asdict())
+
+
+def sweep(points, games, seed=0, workers=None, chunk_size=simulate.CHUNK_SIZE, cache=None, weights=None,
+          players=2, target='default'):
+    """[(rules, totals, cached)] for every configuration in `points`, playing only those missing from `cache`"""
+    cache = cache or Cache()
+    code = code_version()
+    keys = [cache_key(rules, games, seed, players, target, code) for rules in points]
+    totals = [cache.get(key) for key in keys]
+    cached = [result is not None for result in totals]
+    plan = [(index, start, count) for index, result in enumerate(totals) if result is None
+            for start, count in simulate.chunks(games, chunk_size)]
+    remaining = Counter(index for index, _, _ in plan)
+    workers = workers or os.cpu_count() or 1
+
+    owners = iter(index for index, _, _ in plan)  # Results are merged in plan order
+
+    def merge(job, result):
+        index = next(owners)
+        if totals[index] is None:
+            totals[index] = Counter()
+        totals[index].update(result)
+        remaining[index] -= 1
+        if not remaining[index]:
+            cache.put(keys[index], points[index], totals[index])
+
+    simulate.run_jobs(play_chunk, [(points[index], seed, start, count, weights, players, target)
+                                   for index, start, count in plan], workers, merge)
+    return list(zip(points, totals, cached))
+
+
+def report(results):
+    lines = [f"{'bullets':>7}{'lives':>6}{'misfire':>8}{'hazard':>7}{'cooldown':>9}{'finish':>7}{'confident':>10}"
+             f"{'gamble':>7}{'p1':>8}{'p2':>8}{'others':>8}{'snoop':>8}{'wipeout':>8}{'rounds':>7}"]
+    for rules, totals, cached in results:
+        games = totals['games']
+        rates = [totals[key] / games for key in ('player1', 'player2', 'others', 'snoop', 'wipeout')]
+        low, high = rules.hazard_cooldown
+        lines.append(f"{rules.bullets:>7}{rules.lives:>6}{rules.misfire:>8.0%}{rules.hazard_chance:>7.0%}"
+                     f"{f'{low}-{high}':>9}{rules.ai_finish:>7.0%}{rules.ai_confident:>10.0%}{rules.ai_gamble:>7.0%}"
+                     + "".join(f"{rate:>8.1%}" for rate in rates)
+                     + f"{totals['turns'] / games:>7.2f}" + ("  cached" if cached else ""))
+    return lines
+
+
+def cooldown(text):
+    """A hazard cooldown written as MIN-MAX, or a single number of rounds"""
+    try:
+        low, _, high = text.partition('-')
+        return int(low), int(high or low)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected MIN-MAX rounds, got {text!r}") from None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate every combination of the given balance knob values")
+    parser.add_argument("--bullets", type=int, nargs="+", help=f"chamber sizes (default {DEFAULT_RULES.bullets})")
+    parser.add_argument("--lives", type=int, nargs="+", help=f"starting lives (default {DEFAULT_RULES.lives})")
+    parser.add_argument("--misfire", type=float, nargs="+",
+                        help=f"misfire chances per trigger pull (default {DEFAULT_RULES.misfire})")
+    parser.add_argument("--hazard-chance", type=float, nargs="+",
+                        help=f"hazard chances per round off cooldown (default {DEFAULT_RULES.hazard_chance})")
+    parser.add_argument("--hazard-cooldown", type=cooldown, nargs="+", metavar="MIN-MAX",
+                        help="rounds without a hazard after one strikes (default {}-{})".format(
+                            *DEFAULT_RULES.hazard_cooldown))
+    parser.add_argument("--ai-finish", type=float, nargs="+",
+                        help=f"AI chances to shoot an opponent on one life (default {DEFAULT_RULES.ai_finish})")
+    parser.add_argument("--ai-confident", type=float, nargs="+",
+                        help=f"AI chances to shoot the opponent when healthy (default {DEFAULT_RULES.ai_confident})")
+    parser.add_argument("--ai-gamble", type=float, nargs="+",
+                        help=f"AI chances to spin the event wheel otherwise (default {DEFAULT_RULES.ai_gamble})")
+    parser.add_argument("-n", "--games", type=int, default=10000, help="games per configuration")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--seed", default="0", help="run seed; every configuration plays the same seeds")
+    parser.add_argument("--chunk-size", type=int, default=simulate.CHUNK_SIZE, help="games per work unit")
+    parser.add_argument("--players", type=int, default=2, help="bots per table")
+    parser.add_argument("--target", choices=sorted(engine.TARGETS), default='default',
+                        help="how players pick who to shoot")
+    parser.add_argument("--weights", help="JSON file with event and hazard weights")
+    parser.add_argument("--cache", default=CACHE_DIR, help="directory of cached configuration results")
+    parser.add_argument("--json", help="also write every configuration's totals to this JSON file")
+    args = parser.parse_args()
+    if args.players < 2:
+        parser.error("--players must be at least 2")
+    weights = engine.reload_weights(args.weights) if args.weights else None
+
+    points = grid(bullets=args.bullets, lives=args.lives, misfire=args.misfire, hazard_chance=args.hazard_chance,
+                  hazard_cooldown=args.hazard_cooldown, ai_finish=args.ai_finish, ai_confident=args.ai_confident,
+                  ai_gamble=args.ai_gamble)
+    for rules in points:
+        try:
+            engine.set_rules(rules._asdict())
+        except ValueError as error:
+            parser.error(str(error))
+    engine.set_rules({})
+
+    start = time.perf_counter()
+    try:
+        results = sweep(points, args.games, args.seed, args.workers, args.chunk_size, Cache(args.cache), weights,
+                        args.players, args.target)
+    except KeyboardInterrupt:
+        print(f"\nStopped; finished configurations are cached in {args.cache}/")
+        return
+    played = sum(not cached for _, _, cached in results)
+    print(f"{len(results)} configurations, {played} played and {len(results) - played} from the cache, "
+          f"in {time.perf_counter() - start:.2f}s\n")
+    print("\n".join(report(results)))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump([{'rules': as_config(rules), 'totals': totals} for rules, totals, _ in results], f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Weighted lookup tables for the event wheel and environmental hazards.
+
+Entries are registered once and sampled in O(1) with Walker's alias
+method, whatever the weights. Weights can be changed at runtime or loaded
+from a JSON config file such as::
+
+    {
+        "events": {"snoop_dogg": 2, "nothing": 0.5},
+        "hazards": {"Toxic Rain": 0}
+    }
+
+Entries missing from the file keep their current weight.
+"""
+import json
+
+
+class WeightedTable:
+    def __init__(self, entries, weights=None):
+        """`entries` is a list of (name, value) pairs; weights default to 1 each"""
+        self.names = [name for name, _ in entries]
+        self.values = [value for _, value in entries]
+        self.weights = [1.0] * len(entries)
+        self.set_weights(weights or {})
+
+    def __len__(self):
+        return len(self.names)
+
+    def set_weights(self, weights):
+        """Update weights from a {name: weight} mapping and rebuild the sampler"""
+        new = list(self.weights)
+        for name, weight in weights.items():
+            if name not in self.names:
+                raise ValueError(f"Unknown entry {name!r}, expected one of: {', '.join(self.names)}")
+            if weight < 0:
+                raise ValueError(f"Weight for {name!r} must not be negative")
+            new[self.names.index(name)] = float(weight)
+        total = sum(new)
+        if total <= 0:
+            raise ValueError("At least one entry needs a positive weight")
+        self.weights = new
+        self.build(total)
+
+    def build(self, total):
+        """Build the alias table (Vose's variant of Walker's method)"""
+        n = len(self.weights)
+        scaled = [weight * n / total for weight in self.weights]
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            prob[less] = scaled[less]
+            alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+        self.prob = prob
+        self.alias = alias
+
+    def probabilities(self):
+        total = sum(self.weights)
+        return [weight / total for weight in self.weights]
+
+    def sample_index(self, rng):
+        """Pick an entry index with one uniform draw"""
+        u = rng.random() * len(self.prob)
+        index = int(u)
+        if u - index < self.prob[index]:
+            return index
+        return self.alias[index]
+
+    def sample(self, rng):
+        """Pick a (name, value) pair"""
+        index = self.sample_index(rng)
+        return self.names[index], self.values[index]
+
+
+def load_weights(path):
+    """Read a weights config file into {"events": {...}, "hazards": {...}}"""
+    with open(path) as f:
+        config = json.load(f)
+    unknown = set(config) - {"events", "hazards"}
+    if unknown:
+        raise ValueError(f"Unknown sections in {path}: {', '.join(sorted(unknown))}")
+    return config
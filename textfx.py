@@ -0,0 +1,118 @@
+"""Precompiled typewriter and drunk text effects.
+
+An effect is worked out in full before anything is shown: which
+characters get a typo, what the wrong letters are and how long to pause
+after each one. The steps are then grouped into frames that each last at
+least one display tick, so a line is written in a handful of writes
+instead of one print, flush and sleep per character. Typewriter frames
+for a given string never change and are cached, so repeated
+announcements cost a dictionary lookup.
+
+Drunk typing places its typos by drawing the gap to the next one (a
+geometric distribution). At its 10% typo rate that is cheaper than a draw
+per character. Drunk text swaps 30% of the letters, where the logarithm per
+typo costs more than it saves, so it rolls for each character in one pass.
+"""
+import math
+import random
+import sys
+from functools import lru_cache
+
+LETTERS = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+TYPO_CHARS = LETTERS + '!@#$%^&*()'
+FRAME_SECONDS = 0.05  # Shortest real pause between two writes
+
+
+def typo_positions(length, chance, rng=random):
+    """Indexes below `length` that each get hit with probability `chance`"""
+    if chance <= 0:
+        return []
+    if chance >= 1:
+        return list(range(length))
+    log_miss = math.log(1 - chance)
+    positions = []
+    i = -1
+    while True:
+        i += 1 + int(math.log(1.0 - rng.random()) / log_miss)
+        if i >= length:
+            return positions
+        positions.append(i)
+
+
+def drunk_text(text, chance=0.3, rng=random):
+    """`text` with about `chance` of its letters swapped for random ones"""
+    draw = rng.random
+    chars = list(text)
+    for i, char in enumerate(text):
+        if draw() < chance and char.isalpha():
+            chars[i] = rng.choice(LETTERS)
+    return ''.join(chars)
+
+
+def frames(steps, min_pause):
+    """Group (text, pause, done, typo) steps into frames lasting at least `min_pause` each
+
+    `done` counts the characters of the final text finished after a step,
+    and `typo` is True while a wrong character is still on screen, so
+    playback can jump straight to the end of the line from any frame.
+    """
+    grouped = []
+    chunk = []
+    pause = 0.0
+    for text, step_pause, done, typo in steps:
+        chunk.append(text)
+        pause += step_pause
+        if pause >= min_pause:
+            grouped.append((''.join(chunk), pause, done, typo))
+            chunk = []
+            pause = 0.0
+    if chunk:
+        grouped.append((''.join(chunk), pause) + steps[-1][2:])
+    return tuple(grouped)
+
+
+@lru_cache(maxsize=512)
+def typewriter(text, delay=0.03, min_pause=FRAME_SECONDS):
+    """Frames that type `text` out at `delay` seconds per character"""
+    return frames([(char, delay, i + 1, False) for i, char in enumerate(text)], min_pause)
+
+
+def drunk_typing(text, delay=0.05, min_pause=FRAME_SECONDS, chance=0.1, rng=random):
+    """Frames that type `text` with typos that get noticed and corrected"""
+    positions = typo_positions(len(text), chance, rng)
+    wrong = iter(rng.choices(TYPO_CHARS, k=len(positions)))
+    typos = set(positions)
+    steps = []
+    for i, char in enumerate(text):
+        if i in typos:
+            steps.append((next(wrong), 0.1, i, True))
+            steps.append(('\b' + char, delay, i + 1, False))
+        else:
+            steps.append((char, delay, i + 1, False))
+    return frames(steps, min_pause)
+
+
+def frame_pause(clock):
+    """Shortest game-time pause per frame so real frames last FRAME_SECONDS"""
+    if clock.mode == 'turbo':
+        return math.inf  # Nobody is watching: one write for the whole line
+    if clock.mode == 'fast':
+        return FRAME_SECONDS * clock.speed
+    return FRAME_SECONDS
+
+
+def play(effect, text, clock, skip=None, out=None):
+    """Write an effect's frames, pausing on `clock`; `skip()` returning True jumps to the end"""
+    out = out or sys.stdout
+    shown = 0  # Characters of `text` already finished
+    typo = False  # A wrong character is on screen
+    for chunk, pause, done, step_typo in effect:
+        if skip and skip():
+            out.write(('\b' if typo else '') + text[shown:])
+            break
+        out.write(chunk)
+        out.flush()
+        clock.sleep(pause)
+        shown, typo = done, step_typo
+    out.write('\n')
+    out.flush()
@@ -0,0 +1,234 @@
+"""Round-robin tournaments between AI strategies, rated with Elo.
+
+Every pair of entrants plays ``--games`` games, swapping seats each game.
+The games are split into chunks that run on worker processes. Each game's
+seed is derived from the run seed, the pairing and the game's number (see
+streams.py). Chunks are merged in a fixed order, interleaving the
+pairings, and the Elo ratings are updated game by game as each chunk comes
+in. The mcts entrant plays a fixed number of rollouts per move
+(``--rollouts``) rather than thinking against the clock, seeds its search
+from the game and starts every game with an empty search tree. Every game
+is therefore decided by its seed alone, and the same seed gives the same
+standings whatever the worker count, and whether or not the run was
+resumed.
+
+The classic AI is always entered and is the baseline: its rating is the
+reference the others are reported against.
+
+After every merged chunk the standings are written to the checkpoint file.
+Running the same command again skips the chunks already played and carries
+on from the saved ratings:
+
+    python tournament.py random mcts perfect --games 2000 --checkpoint cup.json
+"""
+import argparse
+import json
+import os
+import time
+from itertools import combinations
+
+import engine
+from engine import GameState
+from simulate import run_jobs
+from strategies import STRATEGIES, make
+from streams import game_seed
+
+ENTRANTS = STRATEGIES
+BASELINE = 'classic'
+START_RATING = 1500.0
+K_FACTOR = 16.0
+CHUNK_SIZE = 100
+ROLLOUTS = 150  # mcts rollouts per move, about 20 ms of thinking
+
+AIS = {}  # (entrant, options) -> strategy, built once per process
+
+
+def entrant(name, rollouts=ROLLOUTS, policy="policy.bin"):
+    """The strategy (see strategies.py) for the entrant called `name`"""
+    key = (name, rollouts, policy)
+    if key not in AIS:
+        AIS[key] = make(name, policy=policy, rollouts=rollouts)
+    return AIS[key]
+
+
+def play_chunk(seed, first, second, start, count, options, weights=None):
+    """Play games `start` to `start + count` of a pairing; returns `first`'s score per game in half points
+
+    Even-numbered games seat `first` as player 1, odd ones as player 2. A
+    wipeout or a Snoop Dogg win counts as a draw.
+    """
+    if weights:
+        engine.set_weights(weights)
+    ais = {first: entrant(first, **options), second: entrant(second, **options)}
+    pairing = f"{seed}:{first}:{second}"
+    scores = bytearray(count)
+    for i in range(count):
+        order = (first, second) if (start + i) % 2 == 0 else (second, first)
+        game = GameState(order[0], order[1], seed=game_seed(pairing, start + i))
+        seats = {id(game.player1): ais[order[0]], id(game.player2): ais[order[1]]}
+        for ai in ais.values():
+            ai.new_game()
+
+        def decide(game, player, target):
+            return seats.get(id(player), engine.ai_decide)(game, player, target)
+
+        winners = engine.play(game, decide)
+        if not winners or winners[0] is game.snoop:
+            scores[i] = 1
+        elif (winners[0] is game.player1) == (order[0] == first):
+            scores[i] = 2
+    return bytes(scores)
+
+
+def schedule(entrants, games, chunk_size=CHUNK_SIZE):
+    """(first, second, start, count) jobs, one chunk of every pairing after another"""
+    pairs = list(combinations(entrants, 2))
+    return [(first, second, start, min(chunk_size, games - start))
+            for start in range(0, games, chunk_size) for first, second in pairs]
+
+
+class Elo:
+    def __init__(self, names, k=K_FACTOR, start=START_RATING):
+        self.k = k
+        self.ratings = {name: start for name in names}
+
+    def expected(self, a, b):
+        """Expected score of `a` against `b`"""
+        return 1 / (1 + 10 ** ((self.ratings[b] - self.ratings[a]) / 400))
+
+    def update(self, a, b, score):
+        delta = self.k * (score - self.expected(a, b))
+        self.ratings[a] += delta
+        self.ratings[b] -= delta
+
+
+class Tournament:
+    """Ratings and results so far, merged chunk by chunk and saved to a checkpoint"""
+
+    def __init__(self, config, checkpoint=None):
+        self.config = config
+        self.checkpoint = checkpoint
+        self.elo = Elo(config['entrants'], config['k_factor'])
+        self.results = {f"{a}|{b}": [0, 0, 0] for a, b in combinations(config['entrants'], 2)}  # wins, draws, losses
+        self.done = 0  # Jobs of the schedule merged so far
+        if checkpoint and os.path.exists(checkpoint):
+            self.load()
+
+    def load(self):
+        with open(self.checkpoint) as f:
+            data = json.load(f)
+        if data['config'] != self.config:
+            raise ValueError(f"{self.checkpoint} belongs to a different tournament; pick another --checkpoint")
+        self.elo.ratings = data['ratings']
+        self.results = data['results']
+        self.done = data['done']
+
+    def save(self):
+        if not self.checkpoint:
+            return
+        temp = f"{self.checkpoint}.tmp"
+        with open(temp, 'w') as f:
+            json.dump({'config': self.config, 'done': self.done, 'ratings': self.elo.ratings,
+                       'results': self.results}, f, indent=2)
+        os.replace(temp, self.checkpoint)  # An interrupted save never leaves a broken checkpoint
+
+    def merge(self, first, second, scores):
+        tally = self.results[f"{first}|{second}"]
+        for score in scores:
+            tally[2 - score] += 1
+            self.elo.update(first, second, score / 2)
+        self.done += 1
+        self.save()
+
+    def standings(self):
+        """(name, rating relative to the baseline, games, wins, draws, losses), best first"""
+        rows = {name: [0, 0, 0] for name in self.config['entrants']}
+        for pair, (wins, draws, losses) in self.results.items():
+            first, second = pair.split('|')
+            for name, tally in ((first, (wins, draws, losses)), (second, (losses, draws, wins))):
+                rows[name] = [total + count for total, count in zip(rows[name], tally)]
+        base = self.elo.ratings[BASELINE] - START_RATING
+        table = [(name, self.elo.ratings[name] - base, sum(row), *row) for name, row in rows.items()]
+        return sorted(table, key=lambda row: row[1], reverse=True)
+
+    def report(self):
+        lines = [f"{'entrant':<10}{'elo':>8}{'games':>8}{'wins':>8}{'draws':>8}{'losses':>8}{'score':>9}"]
+        for name, rating, games, wins, draws, losses in self.standings():
+            score = (wins + draws / 2) / games if games else 0.0
+            lines.append(f"{name:<10}{rating:>8.0f}{games:>8}{wins:>8}{draws:>8}{losses:>8}{score:>9.1%}")
+        lines.append("")
+        lines.append("Head to head (score of the row entrant):")
+        names = [row[0] for row in self.standings()]
+        lines.append(" " * 10 + "".join(f"{name:>10}" for name in names))
+        for a in names:
+            cells = []
+            for b in names:
+                tally = self.results.get(f"{a}|{b}")
+                if tally is None and f"{b}|{a}" in self.results:
+                    tally = self.results[f"{b}|{a}"][::-1]
+                games = sum(tally) if tally else 0
+                cells.append(f"{(tally[0] + tally[1] / 2) / games:>10.1%}" if games else f"{'-':>10}")
+            lines.append(f"{a:<10}" + "".join(cells))
+        return lines
+
+
+def run(tournament, workers=None, weights=None):
+    """Play every job of the schedule not yet in the checkpoint"""
+    config = tournament.config
+    jobs = schedule(config['entrants'], config['games'], config['chunk_size'])[tournament.done:]
+    options = {'rollouts': config['rollouts'], 'policy': config['policy']}
+    workers = workers or os.cpu_count() or 1
+
+    def merge(job, scores):
+        _, first, second = job[:3]
+        tournament.merge(first, second, scores)
+
+    run_jobs(play_chunk, [(config['seed'], first, second, start, count, options, weights)
+                          for first, second, start, count in jobs], workers, merge)
+    return tournament
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play a round-robin tournament between AI strategies")
+    parser.add_argument("entrants", nargs="*", metavar="ENTRANT",
+                        help=f"strategies to enter besides the {BASELINE} baseline: {', '.join(ENTRANTS)}")
+    parser.add_argument("-n", "--games", type=int, default=1000, help="games per pairing")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--seed", default="0", help="run seed; the same seed plays the same games")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="games per work unit")
+    parser.add_argument("--k-factor", type=float, default=K_FACTOR, help="Elo K-factor")
+    parser.add_argument("--checkpoint", help="save progress here after every chunk and resume from it")
+    parser.add_argument("--rollouts", type=int, default=ROLLOUTS, help="rollouts per move for the mcts AI")
+    parser.add_argument("--policy", default="policy.bin", help="policy table for the perfect AI (see solver.py)")
+    parser.add_argument("--weights", help="JSON file with event and hazard weights")
+    args = parser.parse_args()
+    weights = engine.reload_weights(args.weights) if args.weights else None
+    unknown = [name for name in args.entrants if name not in ENTRANTS]
+    if unknown:
+        parser.error(f"unknown entrant {unknown[0]!r} (choose from {', '.join(ENTRANTS)})")
+
+    entrants = [BASELINE] + [name for name in dict.fromkeys(args.entrants) if name != BASELINE]
+    if len(entrants) < 2:
+        parser.error(f"enter at least one strategy to play against the {BASELINE} baseline")
+    config = {
+        'entrants': entrants, 'games': args.games, 'seed': args.seed, 'chunk_size': args.chunk_size,
+        'k_factor': args.k_factor, 'rollouts': args.rollouts, 'policy': args.policy,
+        'weights': engine.weights_digest().hex(),
+    }
+    tournament = Tournament(config, args.checkpoint)
+    total = len(schedule(entrants, args.games, args.chunk_size))
+    if tournament.done:
+        print(f"Resuming from {args.checkpoint}: {tournament.done} of {total} chunks already played")
+
+    start = time.perf_counter()
+    try:
+        run(tournament, args.workers, weights)
+    except KeyboardInterrupt:
+        print(f"\nStopped after {tournament.done} of {total} chunks"
+              + (f"; run again to resume from {args.checkpoint}" if args.checkpoint else ""))
+    print(f"Played in {time.perf_counter() - start:.2f}s\n")
+    print("\n".join(tournament.report()))
+
+
+if __name__ == "__main__":
+    main()